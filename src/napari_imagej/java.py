@@ -278,6 +278,10 @@ class NijJavaClasses(JavaClasses):
     def ArrayList(self):
         return "java.util.ArrayList"
 
+    @JavaClasses.java_import
+    def Arrays(self):
+        return "java.util.Arrays"
+
     @JavaClasses.java_import
     def BigDecimal(self):
         return "java.math.BigDecimal"
@@ -290,6 +294,10 @@ class NijJavaClasses(JavaClasses):
     def ByteArrayOutputStream(self):
         return "java.io.ByteArrayOutputStream"
 
+    @JavaClasses.java_import
+    def Collections(self):
+        return "java.util.Collections"
+
     @JavaClasses.java_import
     def Date(self):
         return "java.util.Date"
@@ -310,10 +318,26 @@ class NijJavaClasses(JavaClasses):
     def Path(self):
         return "java.nio.file.Path"
 
+    @JavaClasses.java_import
+    def Runnable(self):
+        return "java.lang.Runnable"
+
+    @JavaClasses.java_import
+    def System(self):
+        return "java.lang.System"
+
     @JavaClasses.java_import
     def Thread(self):
         return "java.lang.Thread"
 
+    @JavaClasses.java_import
+    def WeakHashMap(self):
+        return "java.util.WeakHashMap"
+
+    @JavaClasses.java_import
+    def WeakReference(self):
+        return "java.lang.ref.WeakReference"
+
     @JavaClasses.java_import
     def Window(self):
         return "java.awt.Window"
@@ -324,10 +348,18 @@ class NijJavaClasses(JavaClasses):
 
     # SciJava Types
 
+    @JavaClasses.java_import
+    def Cancelable(self):
+        return "org.scijava.Cancelable"
+
     @JavaClasses.java_import
     def DisplayPostprocessor(self):
         return "org.scijava.display.DisplayPostprocessor"
 
+    @JavaClasses.java_import
+    def DynamicCommand(self):
+        return "org.scijava.command.DynamicCommand"
+
     @JavaClasses.java_import
     def FileWidget(self):
         return "org.scijava.widget.FileWidget"
@@ -336,6 +368,10 @@ class NijJavaClasses(JavaClasses):
     def InputHarvester(self):
         return "org.scijava.widget.InputHarvester"
 
+    @JavaClasses.java_import
+    def IntArray(self):
+        return "org.scijava.util.IntArray"
+
     @JavaClasses.java_import
     def Module(self):
         return "org.scijava.module.Module"
@@ -372,6 +408,10 @@ class NijJavaClasses(JavaClasses):
     def ModuleItem(self):
         return "org.scijava.module.ModuleItem"
 
+    @JavaClasses.java_import
+    def ModuleRunner(self):
+        return "org.scijava.module.ModuleRunner"
+
     @JavaClasses.java_import
     def ModuleStartedEvent(self):
         return "org.scijava.module.event.ModuleStartedEvent"
@@ -444,6 +484,10 @@ class NijJavaClasses(JavaClasses):
 
     # ImgLib2 Types
 
+    @JavaClasses.java_import
+    def AbstractCellImg(self):
+        return "net.imglib2.img.cell.AbstractCellImg"
+
     @JavaClasses.java_import
     def BitType(self):
         return "net.imglib2.type.logic.BitType"
@@ -532,6 +576,10 @@ class NijJavaClasses(JavaClasses):
     def RealType(self):
         return "net.imglib2.type.numeric.RealType"
 
+    @JavaClasses.java_import
+    def Views(self):
+        return "net.imglib2.view.Views"
+
     # ImgLib2-algorithm Types
 
     @JavaClasses.java_import
@@ -634,10 +682,18 @@ class NijJavaClasses(JavaClasses):
     def Axes(self):
         return "net.imagej.axis.Axes"
 
+    @JavaClasses.java_import
+    def BufferMesh(self):
+        return "net.imagej.mesh.nio.BufferMesh"
+
     @JavaClasses.java_import
     def Dataset(self):
         return "net.imagej.Dataset"
 
+    @JavaClasses.java_import
+    def DatasetUpdatedEvent(self):
+        return "net.imagej.event.DatasetUpdatedEvent"
+
     @JavaClasses.java_import
     def DatasetView(self):
         return "net.imagej.display.DatasetView"
@@ -670,6 +726,10 @@ class NijJavaClasses(JavaClasses):
     def Mesh(self):
         return "net.imagej.mesh.Mesh"
 
+    @JavaClasses.java_import
+    def Meshes(self):
+        return "net.imagej.mesh.Meshes"
+
     @JavaClasses.java_import
     def NaiveDoubleMesh(self):
         return "net.imagej.mesh.naive.NaiveDoubleMesh"
@@ -2,12 +2,15 @@
 A napari reader plugin for importing TrackMate data stored in XML
 """
 
+import os
 import xml.etree.ElementTree as ET
+from typing import Dict, List
 
+import numpy as np
 from napari.utils import progress
 from scyjava import jimport
 
-from napari_imagej import nij
+from napari_imagej import nij, settings
 from napari_imagej.java import jc
 from napari_imagej.types.converters.trackmate import (
     model_and_image_to_tracks,
@@ -28,9 +31,13 @@ def napari_get_reader(path):
         return None
 
     # Ensure that the xml file is a TrackMate file
-    if not ET.parse(path).getroot().tag == "TrackMate":
+    if not _is_trackmate_xml(path):
         return None
 
+    # Tracks can be read without TrackMate (or the JVM)
+    if settings.trackmate_tracks_only:
+        return tracks_reader_function
+
     # Ensure TrackMate available
     if not trackmate_present():
         return None
@@ -39,6 +46,26 @@ def napari_get_reader(path):
     return reader_function
 
 
+def _is_trackmate_xml(path, max_bytes: int = 65536) -> bool:
+    """
+    Determines whether the XML file at path is a TrackMate file, by
+    incrementally parsing only as much as is needed to find its root tag.
+    """
+    parser = ET.XMLPullParser(events=("start",))
+    with open(path, "rb") as f:
+        for _ in range(0, max_bytes, 4096):
+            chunk = f.read(4096)
+            if not chunk:
+                break
+            try:
+                parser.feed(chunk)
+            except ET.ParseError:
+                return False
+            for _, elem in parser.read_events():
+                return elem.tag == "TrackMate"
+    return False
+
+
 def reader_function(path):
     pbr = progress(total=4, desc="Importing TrackMate XML: Starting JVM")
     ij = nij.ij
@@ -66,3 +93,133 @@ def reader_function(path):
         (py_tracks.data, {"name": py_tracks.name}, "tracks"),
         (py_labels.data, {"name": py_labels.name}, "labels"),
     ]
+
+
+def tracks_reader_function(path):
+    """
+    Reads the tracks of a TrackMate XML file, without TrackMate or the JVM.
+    """
+    pbr = progress(total=2, desc="Importing TrackMate XML: Reading Tracks")
+    columns = _read_trackmate_columns(path)
+    pbr.update()
+
+    pbr.set_description("Importing TrackMate XML: Converting Tracks")
+    data, graph = _columns_to_tracks(columns)
+    pbr.update()
+
+    pbr.close()
+    title = columns["title"] or os.path.basename(path)
+    return [(data, {"name": f"{title}-tracks", "graph": graph}, "tracks")]
+
+
+def _read_trackmate_columns(path) -> Dict:
+    """
+    Streams the spots, edges and image calibration out of a TrackMate XML
+    file. Elements are discarded as soon as they are read, such that the
+    document is never held in memory in its entirety.
+
+    :param path: The path to the TrackMate XML file
+    :return: A dict of NumPy columns (spot IDs, positions and frames; edge
+        sources and targets) along with the image calibration and title.
+    """
+    spots: Dict[str, List] = {k: [] for k in ["id", "x", "y", "z", "frame"]}
+    edges: Dict[str, List] = {k: [] for k in ["track", "source", "target"]}
+    visible_tracks = set()
+    image = {}
+    track_id = None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "Track":
+                track_id = int(elem.get("TRACK_ID"))
+            continue
+        if elem.tag == "Spot":
+            spots["id"].append(int(elem.get("ID")))
+            spots["x"].append(float(elem.get("POSITION_X")))
+            spots["y"].append(float(elem.get("POSITION_Y")))
+            spots["z"].append(float(elem.get("POSITION_Z", 0)))
+            spots["frame"].append(int(float(elem.get("FRAME"))))
+        elif elem.tag == "Edge":
+            edges["track"].append(track_id)
+            edges["source"].append(int(elem.get("SPOT_SOURCE_ID")))
+            edges["target"].append(int(elem.get("SPOT_TARGET_ID")))
+        elif elem.tag == "TrackID":
+            visible_tracks.add(int(elem.get("TRACK_ID")))
+        elif elem.tag == "ImageData":
+            image = dict(elem.attrib)
+        elif elem.tag not in ["SpotsInFrame", "Track"]:
+            continue
+        # NB discard the (already read) element, and its (cleared) children
+        elem.clear()
+    # NB like TrackMate, only consider visible (i.e. filtered) tracks
+    track = np.array(edges["track"], dtype=np.int64)
+    visible = np.isin(track, list(visible_tracks))
+    return {
+        **{k: np.array(v) for k, v in spots.items()},
+        "source": np.array(edges["source"], dtype=np.int64)[visible],
+        "target": np.array(edges["target"], dtype=np.int64)[visible],
+        "calibration": np.array(
+            [
+                float(image.get(k, 1) or 1)
+                for k in ["voxeldepth", "pixelheight", "pixelwidth"]
+            ]
+        ),
+        "has_z": int(image.get("nslices", 1) or 1) > 1,
+        "title": image.get("filename", ""),
+    }
+
+
+def _columns_to_tracks(columns: Dict):
+    """
+    Builds napari Tracks data from TrackMate spot and edge columns.
+
+    Like the TrackMate converter, each track is decomposed into branches,
+    which break wherever a spot divides or merges. Each branch becomes a
+    napari track, and the graph maps each branch to its parent branches.
+
+    :param columns: The columns, as read by _read_trackmate_columns
+    :return: The Tracks data, and the Tracks graph
+    """
+    ids, frames = columns["id"], columns["frame"]
+    order = np.argsort(ids)
+    # Map spot IDs to spot indices
+    source = order[np.searchsorted(ids, columns["source"], sorter=order)]
+    target = order[np.searchsorted(ids, columns["target"], sorter=order)]
+    # Ensure each edge points forward in time
+    backward = frames[source] > frames[target]
+    source[backward], target[backward] = target[backward], source[backward]
+
+    # Only spots within tracks are considered
+    n = len(ids)
+    in_degree = np.bincount(target, minlength=n)
+    out_degree = np.bincount(source, minlength=n)
+    in_track = (in_degree + out_degree) > 0
+    # A spot continues the branch of its parent iff it has exactly one
+    # parent, which has exactly one child
+    parent = np.arange(n)
+    parent[target] = source
+    continues = (in_degree == 1) & (out_degree[parent] == 1)
+    # Find the first spot of each branch, by pointer jumping
+    root = np.where(continues, parent, np.arange(n))
+    while True:
+        next_root = root[root]
+        if np.array_equal(next_root, root):
+            break
+        root = next_root
+    # Number the branches
+    branch_roots, branch = np.unique(root[in_track], return_inverse=True)
+    branch_of = np.full(n, -1)
+    branch_of[in_track] = branch
+
+    # Each edge into a branch's first spot links it to a parent branch
+    graph = {int(b): [] for b in range(len(branch_roots))}
+    links = ~continues[target]
+    for s, t in zip(branch_of[source[links]], branch_of[target[links]]):
+        graph[int(t)].append(int(s))
+
+    # Build the Tracks data - each row is (branch, t, z, y, x)
+    positions = np.column_stack((columns["z"], columns["y"], columns["x"]))
+    positions = positions / columns["calibration"]
+    data = np.column_stack((branch_of, frames, positions))[in_track]
+    if not columns["has_z"]:
+        data = np.delete(data, 2, 1)
+    return data, graph
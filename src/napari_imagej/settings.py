@@ -35,10 +35,56 @@ jvm_command_line_arguments: str = ""
     Additional command line arguments to pass to the Java Virtual Machine (JVM).
     For example, "-Xmx4g" to allow Java to use up to 4 GB of memory.
     By default, no arguments are passed.
+
+lazy_image_conversion: bool = False
+    Designates whether images from ImageJ are loaded lazily into napari.
+    If True, images are exposed to napari as dask arrays, and each chunk
+    (e.g. each cell of a CellImg) is copied from ImageJ only when napari
+    needs it. This is recommended for images larger than available memory.
+    If False, images are copied into memory in their entirety.
+    Defaults to False.
+
+multiscale_image_conversion: bool = False
+    Designates whether large images from ImageJ are loaded into napari
+    as multiscale pyramids, which makes panning and zooming more responsive.
+    If True, downsampled levels are added until each level fits within
+    512x512 pixels in XY. Every level is loaded lazily, as described above.
+    If False, images are loaded at full resolution only.
+    Defaults to False.
+
+link_exported_layers: bool = False
+    Designates whether napari Image layers sent to ImageJ stay linked with it.
+    If True, a layer and the ImageJ Dataset created from it share one buffer,
+    so edits on either side are shown on the other without another transfer.
+    Layers whose data ImageJ cannot wrap in place are still copied.
+    If False, ImageJ receives an independent Dataset.
+    Defaults to False.
+
+trackmate_tracks_only: bool = False
+    Designates whether TrackMate XML files are imported as tracks only.
+    If True, tracks are streamed directly out of the XML file, without
+    starting ImageJ; the image and label image are not imported.
+    If False, the image, tracks and label image are imported using TrackMate.
+    Defaults to False.
+
+cache_type_information: bool = False
+    Designates whether information about ImageJ types is cached on disk.
+    If True, the results of expensive queries made while building widgets
+    (e.g. which Python types can satisfy each Java type, and the signature of
+    each ImageJ command) are saved, and reused by later sessions launching the
+    same ImageJ installation.
+    If False, this information is recomputed in each session.
+    Defaults to False.
+
+max_concurrent_modules: int = 4
+    The maximum number of ImageJ commands that may run at once.
+    Further commands wait in a queue until a running command finishes.
+    Defaults to 4.
 """
 
 import os
 import sys
+from hashlib import sha1
 from logging import DEBUG, getLogger
 from typing import Any, Callable, Dict, Optional
 
@@ -55,6 +101,12 @@ defaults = {
     "include_imagej_legacy": True,
     "enable_imagej_gui": True,
     "jvm_command_line_arguments": "",
+    "lazy_image_conversion": False,
+    "multiscale_image_conversion": False,
+    "link_exported_layers": False,
+    "trackmate_tracks_only": False,
+    "cache_type_information": False,
+    "max_concurrent_modules": 4,
 }
 
 # -- Configuration options --
@@ -64,6 +116,12 @@ imagej_base_directory: str = defaults["imagej_base_directory"]
 include_imagej_legacy: bool = defaults["include_imagej_legacy"]
 enable_imagej_gui: bool = defaults["enable_imagej_gui"]
 jvm_command_line_arguments: str = defaults["jvm_command_line_arguments"]
+lazy_image_conversion: bool = defaults["lazy_image_conversion"]
+multiscale_image_conversion: bool = defaults["multiscale_image_conversion"]
+link_exported_layers: bool = defaults["link_exported_layers"]
+trackmate_tracks_only: bool = defaults["trackmate_tracks_only"]
+cache_type_information: bool = defaults["cache_type_information"]
+max_concurrent_modules: int = defaults["max_concurrent_modules"]
 
 _test_mode = bool(os.environ.get("NAPARI_IMAGEJ_TESTING", None))
 _debug_mode = bool(os.environ.get("DEBUG", None))
@@ -98,6 +156,15 @@ def basedir() -> str:
     return abs_basedir
 
 
+def cache_dir() -> str:
+    """
+    Get the guaranteed-to-exist directory for napari-imagej's on-disk caches.
+    """
+    directory = os.path.join(_confuse_config().config_dir(), "cache")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
 def endpoint() -> str:
     """
     Get the validated endpoint string to use for initializing PyImageJ.
@@ -120,6 +187,24 @@ def headless() -> bool:
     return _is_macos or not enable_imagej_gui
 
 
+def installation_key(version: str) -> str:
+    """
+    Get a key identifying the ImageJ installation, for naming on-disk caches.
+
+    The key changes with the endpoint, the ImageJ version and, for local
+    installations, the modification time of the jars directory (i.e. whenever
+    plugins are added, removed or updated).
+
+    :param version: The version of the running ImageJ
+    :return: A short hexadecimal key
+    """
+    installation = [endpoint(), version]
+    jars = os.path.join(endpoint(), "jars")
+    if os.path.isdir(jars):
+        installation.append(str(os.path.getmtime(jars)))
+    return sha1("|".join(installation).encode("utf-8")).hexdigest()[:16]
+
+
 def jvm_mode() -> str:
     """
     Get the validated JVM mode to use for initializing PyImageJ.
@@ -201,6 +286,9 @@ def validate() -> None:
         Check that the ImageJ GUI is available on this platform.
         Specifically: the GUI is not available on macOS systems.
 
+    max_concurrent_modules
+        Check that at least one command can run at once.
+
     :raise ValueError: If any problems are noticed with the settings.
     """
     errors = []
@@ -214,6 +302,11 @@ def validate() -> None:
             "The ImageJ GUI is not available on macOS systems. "
             "Headless mode will be used."
         )
+    if max_concurrent_modules < 1:
+        errors.append(
+            "At least one ImageJ command must be able to run at once. "
+            "Commands will be run one at a time."
+        )
 
     if len(errors) >= 1:
         raise ValueError(*errors)
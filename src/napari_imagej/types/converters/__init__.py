@@ -8,11 +8,15 @@ automatic discovery of all Converters.
 Notable functions included in the module:
     * install_converters()
         - used to add the napari-imagej Converters to scyjava's conversion framework.
+    * profile_predicates()
+        - used to measure the time spent within each Converter's predicate.
 """
 
 import pkgutil
 from importlib.util import module_from_spec
-from typing import Any, Callable, List
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from weakref import ref
 
 from scyjava import (
     Converter,
@@ -26,43 +30,113 @@ from scyjava import (
 
 JAVA_TO_PY_CONVERTERS: List = []
 PY_TO_JAVA_CONVERTERS: List = []
+# Converters whose predicates depend upon more than the class of the object
+INSTANCE_CONVERTERS: Set[Converter] = set()
+
+# Number of calls to, and total time (in seconds) spent within, each predicate
+PREDICATE_PROFILE: Dict[str, List] = {}
+_profiling: bool = False
+
+
+def profile_predicates(enabled: bool = True) -> None:
+    """
+    Starts (or stops) profiling the predicates of napari-imagej Converters.
+    While profiling, the number of calls to each predicate, and the total time
+    spent within it, are accumulated into PREDICATE_PROFILE.
+    :param enabled: True to start profiling, False to stop
+    """
+    global _profiling
+    _profiling = enabled
+
+
+def predicate_profile() -> List[Tuple[str, int, float]]:
+    """
+    Summarizes the profile of napari-imagej Converter predicates.
+    :return: A list of (converter name, calls, total seconds), sorted such that
+        the predicates dominating conversion time come first.
+    """
+    stats = [(name, calls, secs) for name, (calls, secs) in PREDICATE_PROFILE.items()]
+    return sorted(stats, key=lambda s: s[2], reverse=True)
+
+
+def _profiled(predicate: Callable[[Any], bool], func: Callable):
+    """
+    Wraps a Converter predicate, such that it can be profiled.
+    :param predicate: the predicate
+    :param func: the Converter's function, which names the profile entry
+    :return: the wrapped predicate
+    """
+    name = f"{func.__module__}.{func.__name__}"
+
+    def wrapped(obj) -> bool:
+        if not _profiling:
+            return predicate(obj)
+        start = perf_counter()
+        try:
+            return predicate(obj)
+        finally:
+            stats = PREDICATE_PROFILE.setdefault(name, [0, 0.0])
+            stats[0] += 1
+            stats[1] += perf_counter() - start
+
+    return wrapped
 
 
 def java_to_py_converter(
-    predicate: Callable[[Any], bool], priority: int = Priority.NORMAL
+    predicate: Callable[[Any], bool],
+    priority: int = Priority.NORMAL,
+    per_instance: bool = False,
 ):
     """
     A decorator used to register a given function as a scyjava Converter.
     Decorated functions will be used to convert JAVA objects into PYTHON objects.
     :param predicate: defines situations in which the Converter should be used.
     :param priority: the scyjava Priority of this Converter, used to break ties.
+    :param per_instance: True iff the predicate's verdict may differ between
+        objects of the same class. Otherwise, the verdict is computed only once
+        per class.
     :return: the function
     """
 
     def inner(func: Callable):
-        JAVA_TO_PY_CONVERTERS.append(
-            Converter(predicate=predicate, converter=func, priority=priority)
+        converter = Converter(
+            predicate=_profiled(predicate, func),
+            converter=func,
+            priority=priority,
         )
+        JAVA_TO_PY_CONVERTERS.append(converter)
+        if per_instance:
+            INSTANCE_CONVERTERS.add(converter)
         return func
 
     return inner
 
 
 def py_to_java_converter(
-    predicate: Callable[[Any], bool], priority: int = Priority.NORMAL
+    predicate: Callable[[Any], bool],
+    priority: int = Priority.NORMAL,
+    per_instance: bool = False,
 ):
     """
     A decorator used to register a given function as a scyjava Converter.
     Decorated functions will be used to convert PYTHON objects into JAVA objects.
     :param predicate: defines situations in which the Converter should be used.
     :param priority: the scyjava Priority of this Converter, used to break ties.
+    :param per_instance: True iff the predicate's verdict may differ between
+        objects of the same class. Otherwise, the verdict is computed only once
+        per class.
     :return: the function
     """
 
     def inner(func: Callable):
-        PY_TO_JAVA_CONVERTERS.append(
-            Converter(predicate=predicate, converter=func, priority=priority)
+        converter = Converter(
+            predicate=_profiled(predicate, func),
+            converter=func,
+            priority=priority,
         )
+        PY_TO_JAVA_CONVERTERS.append(converter)
+        if per_instance:
+            INSTANCE_CONVERTERS.add(converter)
         return func
 
     return inner
@@ -90,13 +164,101 @@ for loader, module_name, is_pkg in pkgutil.walk_packages(__path__):
 # PHASE 3 - INSTALL ALL CONVERTERS
 
 
+class _ConverterIndex:
+    """
+    Dispatches objects to napari-imagej Converters of one priority, indexed by
+    class.
+
+    For each class, the Converters are scanned (in order) only once,
+    remembering the winning Converter. Converters whose predicates are
+    per-instance remain candidates, and are checked on every conversion.
+    """
+
+    def __init__(self, converters: List[Converter]):
+        self.converters = sorted(converters, key=lambda c: c.priority, reverse=True)
+        # Maps each class to its candidate Converters. All but the last
+        # candidate are per-instance; the last may be the winning Converter.
+        self._candidates: Dict[type, Tuple[Converter, ...]] = {}
+        # A weak reference to the last object dispatched, and its Converter
+        self._last: Tuple[Optional[ref], Optional[Converter]] = (None, None)
+
+    def _candidates_for(self, cls: type, obj: Any) -> Tuple[Converter, ...]:
+        candidates = self._candidates.get(cls)
+        if candidates is None:
+            found = []
+            for converter in self.converters:
+                if converter in INSTANCE_CONVERTERS:
+                    found.append(converter)
+                elif converter.supports(obj):
+                    found.append(converter)
+                    break
+            candidates = self._candidates[cls] = tuple(found)
+        return candidates
+
+    def lookup(self, obj: Any) -> Optional[Converter]:
+        """
+        Finds the Converter for obj.
+        :param obj: the object to convert
+        :return: the highest-priority Converter supporting obj, or None
+        """
+        last_ref, last_converter = self._last
+        if last_ref is not None and last_ref() is obj:
+            return last_converter
+        candidates = self._candidates_for(type(obj), obj)
+        converter = None
+        for candidate in candidates:
+            if candidate not in INSTANCE_CONVERTERS or candidate.supports(obj):
+                converter = candidate
+                break
+        # NB remembered weakly, as scyjava may never convert obj with this index
+        try:
+            self._last = (ref(obj), converter)
+        except TypeError:
+            # obj cannot be weakly referenced (e.g. a list)
+            self._last = (None, None)
+        return converter
+
+    def supports(self, obj: Any) -> bool:
+        return self.lookup(obj) is not None
+
+    def convert(self, obj: Any, **hints):
+        converter = self.lookup(obj)
+        self._last = (None, None)
+        return converter.convert(obj, **hints)
+
+    def as_converter(self) -> Converter:
+        """
+        Wraps this index into a single scyjava Converter.
+        NB the Converter has the highest priority of all indexed Converters,
+        so all indexed Converters should share one priority.
+        """
+        return Converter(
+            predicate=self.supports,
+            converter=self.convert,
+            priority=max((c.priority for c in self.converters), default=0),
+        )
+
+
+def _indexed_converters(converters: List[Converter]) -> List[Converter]:
+    """
+    Indexes napari-imagej Converters, one index per priority level, such that
+    each Converter keeps its place among the Converters of other libraries.
+    :param converters: the Converters to index
+    :return: one scyjava Converter per priority level
+    """
+    by_priority: Dict[float, List[Converter]] = {}
+    for converter in converters:
+        by_priority.setdefault(converter.priority, []).append(converter)
+    return [_ConverterIndex(c).as_converter() for c in by_priority.values()]
+
+
 def install_converters():
     """Installs napari-imagej specific converters"""
 
     def _install_converters():
-        for converter in JAVA_TO_PY_CONVERTERS:
+        for converter in _indexed_converters(JAVA_TO_PY_CONVERTERS):
             add_py_converter(converter)
-        for converter in PY_TO_JAVA_CONVERTERS:
+        for converter in _indexed_converters(PY_TO_JAVA_CONVERTERS):
             add_java_converter(converter)
 
     when_jvm_starts(_install_converters)
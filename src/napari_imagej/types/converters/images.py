@@ -3,18 +3,37 @@ scyjava Converters for converting between ImageJ ecosystem image types
 (referred to collectively as "java image"s) and napari Image layers
 """
 
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import sha1
 from logging import getLogger
-from typing import Any, List, Union
+from typing import Any, List, Tuple, Union
+from weakref import finalize, ref
 
-from imagej.convert import java_to_xarray
-from jpype import JArray, JByte
+import dask.array as da
+from dask.array.core import normalize_chunks
+from imagej.convert import _permute_rai_to_python, java_to_xarray
+from imagej.dims import _convert_dims, _python_rai_ref_order, prioritize_rai_axes_order
+from jpype import JArray, JByte, JLong
 from napari.layers import Image
 from napari.utils.colormaps import Colormap
-from numpy import ones, uint8
-from scyjava import Priority
+from numpy import (
+    ascontiguousarray,
+    asarray,
+    dtype,
+    frombuffer,
+    int8,
+    ndarray,
+    ones,
+    rint,
+    stack,
+    uint8,
+    zeros,
+)
+from scyjava import Priority, to_python
 from xarray import DataArray
 
-from napari_imagej import nij
+from napari_imagej import nij, settings
 from napari_imagej.java import jc
 from napari_imagej.types.converters import java_to_py_converter, py_to_java_converter
 
@@ -35,37 +54,210 @@ def _java_image_to_image_layer(image: Any) -> Union[Image, List[Image]]:
     """
     # Construct a DatasetView from the Java image
     view = nij.ij.convert().convert(image, jc.DatasetView)
-    existing_ctables = view.getColorTables() and view.getColorTables().size() > 0
+    # NB retrieve all color tables at once, rather than once per channel
+    ctables = list(view.getColorTables() or [])
     data = view.getData()
-    # Construct an xarray from the DatasetView
-    xarr: DataArray = java_to_xarray(nij.ij, data)
+    # Construct xarray(s) from the DatasetView
+    if settings.multiscale_image_conversion:
+        levels: List[DataArray] = _java_image_to_pyramid(data)
+    elif settings.lazy_image_conversion:
+        levels: List[DataArray] = [_java_image_to_lazy_xarray(data)]
+    else:
+        levels: List[DataArray] = [java_to_xarray(nij.ij, data)]
+    xarr = levels[0]
     # General layer parameters
     kwargs = dict()
     kwargs["name"] = data.getName()
     kwargs["metadata"] = getattr(xarr, "attrs", {})
+    if len(levels) > 1:
+        kwargs["multiscale"] = True
 
     # Channel-less data
     if "ch" not in xarr.dims:
-        if existing_ctables:
-            cmap = _color_table_to_colormap(view.getColorTables().get(0))
-            kwargs["colormap"] = cmap
-        pass
+        if ctables:
+            kwargs["colormap"] = _color_table_to_colormap(ctables[0])
     # RGB data - set RGB flag
     elif xarr.sizes["ch"] in [3, 4]:
         kwargs["rgb"] = True
     # Channel data - but not RGB - need one layer per channel
     else:
         kwargs["blending"] = "additive"
+        # NB each channel layer is a view into the same data, and all channel
+        # layers share one metadata dict
         channels = []
         for d in range(xarr.sizes["ch"]):
             kw = kwargs.copy()
             kw["name"] = f"{kwargs['name']}[{d}]"
-            if existing_ctables:
-                cmap = _color_table_to_colormap(view.getColorTables().get(d))
-                kw["colormap"] = cmap
-            channels.append(Image(data=xarr.sel(ch=d), **kw))
+            if d < len(ctables):
+                kw["colormap"] = _color_table_to_colormap(ctables[d])
+            channels.append(Image(data=_layer_data(levels, ch=d), **kw))
         return channels
-    return Image(data=xarr, **kwargs)
+    return Image(data=_layer_data(levels), **kwargs)
+
+
+def _layer_data(levels: List[DataArray], **indexers) -> Any:
+    """
+    Builds napari Image layer data from one or more resolution levels.
+    :param levels: the resolution levels, from finest to coarsest
+    :param indexers: optional positional dimension indexers, applied to each level.
+        NB positional indexing with integers returns views, not copies.
+    :return: the only level, or a list of all levels (for multiscale data)
+    """
+    if indexers:
+        views = [level.isel(**indexers) for level in levels]
+        # NB each view keeps its level alive, as cached pyramids hold their
+        # levels weakly, and are reused only while all levels are in use
+        for view, level in zip(views, levels):
+            finalize(view, _release, level).atexit = False
+        levels = views
+    return levels if len(levels) > 1 else levels[0]
+
+
+def _release(level: DataArray) -> None:
+    """Releases a level, once all views of it are gone."""
+
+
+# NB pyramid levels are added until both X and Y fit within this size
+_PYRAMID_MIN_SIZE = 512
+# NB the number of java images whose pyramids are remembered
+_PYRAMID_CACHE_SIZE = 8
+# NB entries hold weak references only - to the java image, and to each level -
+# such that closed images (and their pixels) are not kept alive by this cache
+_pyramid_cache: OrderedDict = OrderedDict()
+
+
+def _java_image_to_pyramid(image: Any) -> List[DataArray]:
+    """
+    Wraps a java image into a multiscale pyramid of lazy xarrays.
+
+    Each level halves the X and Y extents of the previous level, by subsampling
+    the java image, until both extents fit within _PYRAMID_MIN_SIZE. Pyramids
+    are cached per java image, for as long as their levels (or views of them,
+    e.g. channels) are in use by napari layers, such that repeated imports
+    reuse them. As each level is
+    lazy, cached levels always reflect the current pixel values.
+
+    :param image: a java image (e.g. a Dataset)
+    :return: the pyramid levels, from finest to coarsest
+    """
+    key = jc.System.identityHashCode(image)
+    shape = [int(d) for d in image.dimensionsAsLongArray()]
+    cached = _pyramid_cache.get(key)
+    if cached is not None and cached[0].get() == image and cached[1] == shape:
+        levels = [level_ref() for level_ref in cached[2]]
+        if all(level is not None for level in levels):
+            _pyramid_cache.move_to_end(key)
+            return levels
+
+    levels = [_java_image_to_lazy_xarray(image)]
+    while max(levels[-1].sizes.get(d, 1) for d in ["row", "col"]) > _PYRAMID_MIN_SIZE:
+        levels.append(_java_image_to_lazy_xarray(image, step=2 ** len(levels)))
+
+    _pyramid_cache[key] = (
+        jc.WeakReference(image),
+        shape,
+        [ref(level) for level in levels],
+    )
+    _pyramid_cache.move_to_end(key)
+    if len(_pyramid_cache) > _PYRAMID_CACHE_SIZE:
+        _pyramid_cache.popitem(last=False)
+    return levels
+
+
+def _java_image_to_lazy_xarray(image: Any, step: int = 1) -> DataArray:
+    """
+    Wraps a java image into an xarray backed by a dask array.
+
+    Unlike imagej.convert.java_to_xarray, no pixels are copied here. Instead, each
+    chunk of the dask array is copied out of the java image when it is computed,
+    i.e. when napari displays it.
+
+    :param image: a java image (e.g. a Dataset)
+    :param step: the subsampling step along the X and Y axes
+    :return: an xarray, with dimensions in the same order as java_to_xarray
+    """
+    imgplus = nij.ij.convert().convert(image, jc.ImgPlus)
+    # NB java_to_xarray permutes axes in this same order
+    axis_types = [axis.type() for axis in imgplus.dim_axes]
+    permute_order = prioritize_rai_axes_order(axis_types, _python_rai_ref_order())
+    permuted_rai = _permute_rai_to_python(imgplus)
+
+    # Subsample X and Y, if requested
+    steps = [
+        step if axis_types[d] in [jc.Axes.X, jc.Axes.Y] else 1 for d in permute_order
+    ]
+    rai = permuted_rai
+    if step > 1:
+        rai = jc.Views.subsample(permuted_rai, JArray(JLong)(steps))
+
+    # Chunk along cells, or XY planes, in F-order
+    cell_shape = _cell_shape(imgplus)
+    shape, chunk_shape, offset = [], [], []
+    for i, d in enumerate(permute_order):
+        shape.append(int(rai.dimension(i)))
+        offset.append(int(rai.min(i)))
+        if cell_shape is not None:
+            # NB each chunk of a subsampled image covers one cell of the original
+            chunk_shape.append(max(1, cell_shape[d] // steps[i]))
+        elif axis_types[d] in [jc.Axes.X, jc.Axes.Y]:
+            chunk_shape.append(shape[-1])
+        else:
+            chunk_shape.append(1)
+    # Reverse F-order to C-order
+    shape.reverse()
+    chunk_shape.reverse()
+    dt = nij.ij.py.dtype(permuted_rai)
+
+    def load_chunk(block_info=None):
+        # NB array-location is in C-order, while the RAI is in F-order
+        location = block_info[None]["array-location"][::-1]
+        mins = JArray(JLong)([o + start for o, (start, _) in zip(offset, location)])
+        maxs = JArray(JLong)([o + stop - 1 for o, (_, stop) in zip(offset, location)])
+        chunk = jc.Views.zeroMin(jc.Views.interval(rai, mins, maxs))
+        narr = zeros(block_info[None]["chunk-shape"], dtype=dt)
+        return nij.ij.py.rai_to_numpy(chunk, narr)
+
+    darr = da.map_blocks(
+        load_chunk,
+        chunks=normalize_chunks(tuple(chunk_shape), tuple(shape)),
+        dtype=dt,
+    )
+
+    # Wrap dask array into an xarray with axes matching the permuted RAI.
+    xr_axes = list(permuted_rai.dim_axes)
+    xr_dims = list(permuted_rai.dims)
+    xr_axes.reverse()
+    xr_dims.reverse()
+    steps.reverse()
+    xr_dims = _convert_dims(xr_dims, direction="python")
+    xr_coords = {
+        dim: [axis.calibratedValue(p * s) for p in range(n)]
+        for dim, axis, s, n in zip(xr_dims, xr_axes, steps, darr.shape)
+    }
+    xr_attrs = to_python(permuted_rai.getProperties())
+    return DataArray(
+        darr,
+        dims=xr_dims,
+        coords=xr_coords,
+        attrs=xr_attrs,
+        name=str(imgplus.getName()),
+    )
+
+
+def _cell_shape(imgplus: "jc.ImgPlus") -> Union[List[int], None]:
+    """
+    Finds the cell dimensions of the Img underlying an ImgPlus.
+    :param imgplus: an ImgPlus
+    :return: the cell dimensions, in F-order, if the Img is a cell image (e.g. a
+        CellImg or DiskCachedCellImg), and None otherwise.
+    """
+    img = imgplus.getImg()
+    while isinstance(img, jc.ImgPlus):
+        img = img.getImg()
+    if not isinstance(img, jc.AbstractCellImg):
+        return None
+    grid = img.getCellGrid()
+    return [int(grid.cellDimension(d)) for d in range(grid.numDimensions())]
 
 
 @py_to_java_converter(
@@ -78,8 +270,12 @@ def _image_layer_to_dataset(image: Image, **kwargs) -> "jc.Dataset":
     :param image: a napari Image layer
     :return: a Dataset
     """
+    # Ensure ImageJ can wrap the data in place
+    # NB for multiscale data, only the finest level is transferred
+    data = image.data[0] if image.multiscale else image.data
+    data, transfer = _shareable_data(data)
+    getLogger("napari-imagej").debug(f"Transferring {image.name} ({transfer})")
     # Redefine dimension order if necessary
-    data = image.data
     if hasattr(data, "dims"):
         if "dim_order" in kwargs:
             dim_remapping = {
@@ -149,6 +345,75 @@ def _image_layer_to_dataset(image: Image, **kwargs) -> "jc.Dataset":
     return dataset
 
 
+# NB imglyb can wrap NumPy arrays of these dtypes without copying them
+_SHAREABLE_DTYPES = {
+    dtype(t)
+    for t in [
+        "bool",
+        "int8",
+        "uint8",
+        "int16",
+        "uint16",
+        "int32",
+        "uint32",
+        "int64",
+        "uint64",
+        "float32",
+        "float64",
+        "complex64",
+        "complex128",
+    ]
+}
+
+
+def _is_shareable(arr: Any) -> bool:
+    """
+    Determines whether imglyb can wrap arr in place.
+    :param arr: an array
+    :return: True iff arr is a NumPy array whose buffer ImageJ can use directly
+    """
+    if not isinstance(arr, ndarray):
+        return False
+    if arr.dtype not in _SHAREABLE_DTYPES or not arr.dtype.isnative:
+        return False
+    # Strided access is fine, as long as each stride is a positive item count
+    # NB strides of singleton dimensions are never used
+    return all(
+        s > 0 and s % arr.itemsize == 0 for s, n in zip(arr.strides, arr.shape) if n > 1
+    )
+
+
+def _shareable_data(data: Any) -> Tuple[Any, str]:
+    """
+    Prepares napari Image data for transfer into ImageJ.
+
+    Data that imglyb can wrap in place is returned untouched, such that the
+    resulting Dataset shares its buffer. All other data (e.g. dask arrays or
+    byte-swapped arrays) is copied into one fresh, contiguous buffer, here.
+
+    :param data: the napari Image data
+    :return: a tuple of the (prepared) data and the transfer path taken,
+        which is "shared" if the buffer will be shared and "copy" otherwise.
+    """
+    # xarrays are wrapped by their underlying data
+    if hasattr(data, "dims"):
+        values, transfer = _shareable_data(data.data)
+        if transfer == "copy":
+            data = data.copy(data=values)
+        return data, transfer
+    if _is_shareable(data):
+        return data, "shared"
+    # NB asarray computes lazy (e.g. dask) arrays
+    arr = ascontiguousarray(asarray(data))
+    if not arr.dtype.isnative:
+        arr = arr.astype(arr.dtype.newbyteorder("="))
+    return arr, "copy"
+
+
+# NB the number of distinct LUTs remembered in each conversion direction
+_LUT_CACHE_SIZE = 64
+
+
 def _colormap_to_color_table(cmap: Colormap):
     """
     Converts a napari Colormap into a SciJava ColorTable.
@@ -157,14 +422,24 @@ def _colormap_to_color_table(cmap: Colormap):
     """
     controls = [x / 255 for x in range(256)]
     py_values = cmap.map(controls)
-    shape = py_values.shape
-    j_values = JArray(JArray(JByte))(shape[1])
-    for i in range(shape[1]):
-        j_values[i] = JArray(JByte)(shape[0])
-        for j in range(shape[0]):
-            value = int(round(py_values[j, i] * 255))
-            # map unsigned value to signed
-            j_values[i][j] = value if value < 128 else value - 256
+    # One row of unsigned bytes per component
+    lut = rint(py_values * 255).astype(uint8).T
+    return _lut_to_color_table(lut.tobytes(), lut.shape)
+
+
+@lru_cache(maxsize=_LUT_CACHE_SIZE)
+def _lut_to_color_table(lut: bytes, shape: Tuple[int, int]) -> "jc.ColorTable8":
+    """
+    Converts a LUT into a SciJava ColorTable, memoized by LUT contents.
+    :param lut: The LUT, as unsigned bytes of shape (components, bins)
+    :param shape: The shape of the LUT
+    :return: A SciJava ColorTable
+    """
+    # NB reinterpret unsigned values as (signed) Java bytes
+    values = frombuffer(lut, dtype=int8).reshape(shape)
+    j_values = JArray(JArray(JByte))(shape[0])
+    for i in range(shape[0]):
+        j_values[i] = JArray(JByte)(values[i])
 
     return jc.ColorTable8(j_values)
 
@@ -187,14 +462,32 @@ def _color_table_to_colormap(ctable: "jc.ColorTable"):
     if ctable in builtins:
         return builtins[ctable]
 
-    components = ctable.getComponentCount()
-    bins = ctable.getLength()
-    data = ones((bins, 4), dtype=float)
-    for component in range(components):
-        for bin in range(bins):
-            data[bin, component] = float(ctable.get(component, bin)) / 255.0
+    if isinstance(ctable, jc.ColorTable8):
+        # Copy each component's values at once, as unsigned bytes
+        lut = stack([asarray(row) for row in ctable.getValues()]).view(uint8)
+    else:
+        components = ctable.getComponentCount()
+        bins = ctable.getLength()
+        lut = zeros((components, bins), dtype=uint8)
+        for component in range(components):
+            for bin in range(bins):
+                lut[component, bin] = ctable.get(component, bin)
+    return _lut_to_colormap(lut.tobytes(), lut.shape)
+
+
+@lru_cache(maxsize=_LUT_CACHE_SIZE)
+def _lut_to_colormap(lut: bytes, shape: Tuple[int, int]) -> Colormap:
+    """
+    Converts a LUT into a napari Colormap, memoized by LUT contents.
+    :param lut: The LUT, as unsigned bytes of shape (components, bins)
+    :param shape: The shape of the LUT
+    :return: A napari Colormap
+    """
+    values = frombuffer(lut, dtype=uint8).reshape(shape)
+    data = ones((shape[1], 4), dtype=float)
+    data[:, : shape[0]] = values.T / 255.0
     cmap = Colormap(colors=data)
-    # NB prevents napari from using cached colormaps
-    cmap.name = str(ctable)
+    # NB prevents napari from using cached colormaps of different LUTs
+    cmap.name = f"ColorTable@{sha1(lut).hexdigest()[:8]}"
 
     return cmap
@@ -2,55 +2,188 @@
 scyjava Converters for converting between ImageJ2 Meshes and napari Surfaces
 """
 
+from typing import Optional
+
 import numpy as np
-from jpype import JArray, JDouble
+from jpype import JArray, JDouble, JInt
 from napari.layers import Surface
 from scyjava import Priority
 
 from napari_imagej.java import jc
 from napari_imagej.types.converters import java_to_py_converter, py_to_java_converter
 
+# NB Surfaces cannot hold vertex normals, or texture coordinates, so they are
+# kept in the metadata
+NORMALS_KEY = "vertex_normals"
+TEXTURES_KEY = "texture_coordinates"
+
+# NB Meshes cannot hold vertex values, so the values of each Mesh converted
+# from a Surface are kept here, flattened, until the Mesh is garbage collected
+_mesh_values: Optional["jc.Map"] = None
+
+
+def _values_of_meshes() -> "jc.Map":
+    global _mesh_values
+    if _mesh_values is None:
+        _mesh_values = jc.Collections.synchronizedMap(jc.WeakHashMap())
+    return _mesh_values
+
 
 @java_to_py_converter(
     predicate=lambda obj: isinstance(obj, jc.Mesh), priority=Priority.VERY_HIGH
 )
 def _mesh_to_surface(mesh: "jc.Mesh") -> Surface:
-    """Converts an ImageJ2 Mesh into a napari Surface"""
-    # Vertices
-    vertices = mesh.vertices()
-    py_vertices = np.zeros((vertices.size(), 3))
-    position = JArray(JDouble)(3)
-    for i, vertex in enumerate(vertices):
-        vertex.localize(position)
-        # Note that the dimensions are reversed across the language barrier
-        py_vertices[i, 2] = position[0]
-        py_vertices[i, 1] = position[1]
-        py_vertices[i, 0] = position[2]
-    # Triangles
-    triangles = mesh.triangles()
-    py_triangles = np.zeros((triangles.size(), 3), dtype=np.int64)
-    for i, triangle in enumerate(triangles):
-        py_triangles[i, 0] = triangle.vertex0()
-        py_triangles[i, 1] = triangle.vertex1()
-        py_triangles[i, 2] = triangle.vertex2()
-    return Surface(data=(py_vertices, py_triangles))
+    """
+    Converts an ImageJ2 Mesh into a napari Surface.
+
+    Vertex normals and texture coordinates are placed into the Surface metadata.
+    Vertex values are restored if the Mesh was converted from a Surface.
+    """
+    if isinstance(mesh, jc.BufferMesh):
+        vertices, triangles = mesh.vertices(), mesh.triangles()
+        n_vertices, n_triangles = int(vertices.size()), int(triangles.size())
+        py_vertices = _from_buffer(vertices.verts(), n_vertices, 3)
+        py_normals = _from_buffer(vertices.normals(), n_vertices, 3)
+        py_textures = _from_buffer(vertices.texCoords(), n_vertices, 2)
+        py_triangles = _from_buffer(triangles.indices(), n_triangles, 3)
+    else:
+        # Copy other meshes (e.g. from Ops) into a NaiveDoubleMesh, within Java
+        # NB NaiveDoubleMesh retains double precision, unlike BufferMesh
+        if not isinstance(mesh, jc.NaiveDoubleMesh):
+            copied = jc.NaiveDoubleMesh()
+            jc.Meshes.copy(mesh, copied)
+            mesh = copied
+        vertices, triangles = mesh.vertices(), mesh.triangles()
+        n_vertices, n_triangles = int(vertices.size()), int(triangles.size())
+        py_vertices = _from_arrays(
+            [vertices.xs(), vertices.ys(), vertices.zs()], n_vertices
+        )
+        py_normals = _from_arrays(
+            [vertices.nxs(), vertices.nys(), vertices.nzs()], n_vertices
+        )
+        py_textures = _from_arrays([vertices.us(), vertices.vs()], n_vertices)
+        py_triangles = _from_arrays(
+            [triangles.v0s(), triangles.v1s(), triangles.v2s()], n_triangles
+        )
+
+    # Note that the dimensions are reversed across the language barrier
+    data = (py_vertices[:, ::-1], py_triangles.astype(np.int64))
+    j_values = _values_of_meshes().get(mesh)
+    if j_values is not None and n_vertices > 0:
+        py_values = np.array(j_values).reshape((-1, n_vertices))
+        data += (py_values[0] if len(py_values) == 1 else py_values,)
+    metadata = {NORMALS_KEY: py_normals[:, ::-1], TEXTURES_KEY: py_textures}
+    return Surface(data=data, metadata=metadata)
 
 
 @py_to_java_converter(
     predicate=lambda obj: isinstance(obj, Surface), priority=Priority.VERY_HIGH
 )
 def _surface_to_mesh(surface: Surface) -> "jc.Mesh":
-    """Converts a napari Surface into an ImageJ2 Mesh"""
+    """
+    Converts a napari Surface into an ImageJ2 Mesh.
+
+    Vertex normals are taken from the Surface metadata, if present, and
+    are otherwise computed from the triangles. Texture coordinates are also
+    taken from the Surface metadata, if present. Vertex values are kept
+    alongside the Mesh, and restored when it is converted back.
+    """
     if surface.ndim != 3:
         raise ValueError("Can only convert 3D Surfaces to Meshes!")
     # Surface data is vertices, triangles, colormap data
-    py_vertices, py_triangles, _ = surface.data
+    py_vertices, py_triangles, py_values = surface.data
+    n_vertices = len(py_vertices)
+    # Note that the dimensions are reversed across the language barrier
+    j_vertices = np.asarray(py_vertices, dtype=np.float64)[:, ::-1]
+    py_triangles = np.asarray(py_triangles)
+    py_normals = surface.metadata.get(NORMALS_KEY, None)
+    if py_normals is not None and np.shape(py_normals) == (n_vertices, 3):
+        j_normals = np.asarray(py_normals)[:, ::-1]
+        t_normals = _normalize(_triangle_normals(j_vertices, py_triangles))
+    else:
+        j_normals, t_normals = _normals(j_vertices, py_triangles)
+    textures = surface.metadata.get(TEXTURES_KEY, None)
+    if textures is None or np.shape(textures) != (n_vertices, 2):
+        textures = np.zeros((n_vertices, 2))
 
     mesh: "jc.Mesh" = jc.NaiveDoubleMesh()
-    # TODO: Determine the normals
-    for py_vertex in py_vertices:
-        # Note that the dimensions are reversed across the language barrier
-        mesh.vertices().add(py_vertex[2], py_vertex[1], py_vertex[0])
-    for py_triangle in py_triangles:
-        mesh.triangles().add(*py_triangle)
+    vertices, triangles = mesh.vertices(), mesh.triangles()
+    _to_arrays([vertices.xs(), vertices.ys(), vertices.zs()], j_vertices)
+    _to_arrays([vertices.nxs(), vertices.nys(), vertices.nzs()], j_normals)
+    _to_arrays([vertices.us(), vertices.vs()], textures)
+    _to_arrays([triangles.v0s(), triangles.v1s(), triangles.v2s()], py_triangles)
+    _to_arrays([triangles.nxs(), triangles.nys(), triangles.nzs()], t_normals)
+    _values_of_meshes().put(
+        mesh,
+        JArray(JDouble)(np.ascontiguousarray(py_values, dtype=np.float64).ravel()),
+    )
     return mesh
+
+
+def _from_buffer(buffer, n: int, stride: int) -> np.ndarray:
+    """
+    Copies the first n elements of a BufferMesh buffer into a NumPy array.
+    :param buffer: A (direct) NIO buffer of a BufferMesh
+    :param n: The number of elements (e.g. vertices) to copy
+    :param stride: The number of values per element
+    :return: An array of shape (n, stride)
+    """
+    return np.array(np.asarray(buffer)[: n * stride]).reshape((n, stride))
+
+
+def _from_arrays(arrays, n: int) -> np.ndarray:
+    """
+    Copies the first n values of SciJava primitive arrays into a NumPy array.
+    :param arrays: The (e.g. DoubleArray) columns of a NaiveDoubleMesh
+    :param n: The number of elements (e.g. vertices) to copy
+    :return: An array of shape (n, len(arrays))
+    """
+    # NB each backing Java array is copied in bulk
+    return np.stack([np.asarray(a.getArray())[:n] for a in arrays], axis=1)
+
+
+def _to_arrays(arrays, values: np.ndarray) -> None:
+    """
+    Fills SciJava primitive arrays with the columns of values, in bulk.
+    :param arrays: The (e.g. DoubleArray) columns of a NaiveDoubleMesh
+    :param values: The values, of shape (n, len(arrays))
+    """
+    for array, column in zip(arrays, np.asarray(values).T):
+        if isinstance(array, jc.IntArray):
+            j_column = JArray(JInt)(np.ascontiguousarray(column, dtype=np.int32))
+        else:
+            j_column = JArray(JDouble)(np.ascontiguousarray(column, dtype=np.float64))
+        array.setArray(j_column)
+        array.setSize(len(column))
+
+
+def _triangle_normals(vertices: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """
+    Computes the (area-weighted) triangle normals of a mesh.
+    :param vertices: The (N, 3) vertex positions
+    :param triangles: The (M, 3) vertex indices of each triangle
+    :return: The (M, 3) triangle normals, each of which is not yet normalized
+    """
+    v0, v1, v2 = (vertices[triangles[:, i]] for i in range(3))
+    return np.cross(v1 - v0, v2 - v0)
+
+
+def _normals(vertices: np.ndarray, triangles: np.ndarray):
+    """
+    Computes the vertex and triangle normals of a mesh.
+    :param vertices: The (N, 3) vertex positions
+    :param triangles: The (M, 3) vertex indices of each triangle
+    :return: The (N, 3) unit vertex normals and the (M, 3) unit triangle normals
+    """
+    t_normals = _triangle_normals(vertices, triangles)
+    # Each vertex normal is the area-weighted mean of its triangles' normals
+    v_normals = np.zeros(vertices.shape)
+    for i in range(3):
+        np.add.at(v_normals, triangles[:, i], t_normals)
+    return _normalize(v_normals), _normalize(t_normals)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scales each (nonzero) row of vectors to unit length"""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, lengths, out=np.zeros(vectors.shape), where=lengths > 0)
@@ -3,6 +3,8 @@ scyjava Converters for converting between ImgLib2 RealMasks
 and napari Shapes
 """
 
+from typing import Callable, Dict, List
+
 import numpy as np
 from jpype import JArray, JDouble
 from napari.layers import Shapes
@@ -14,21 +16,27 @@ from napari_imagej.types.converters import java_to_py_converter, py_to_java_conv
 # -- Shapes Utils -- #
 
 
-def arr(coords):
-    arr = JArray(JDouble)(len(coords))
-    arr[:] = coords
-    return arr
+def _to_java_coords(coords: np.ndarray):
+    """
+    Transfers an [N, D] (or [N, M, D]) numpy array of coordinates into Java
+    as one double[][] (or double[][][]), reversing the coordinate order.
+
+    All coordinates are transferred at once; the rows of the result can then
+    be used to construct each mask, without transferring any further data.
+    :param coords: The numpy array of coordinates
+    :return: The Java array of coordinates
+    """
+    return JArray.of(np.ascontiguousarray(coords[..., ::-1], dtype=np.float64))
 
 
-def realPoint_from(coords: np.ndarray):
+def _concatenate(data: List[np.ndarray]):
     """
-    Creates a RealPoint from a numpy [1, D] array of coordinates.
-    :param coords: The [1, D] numpy array of coordinates
-    :return: a RealPoint
+    Concatenates the vertices of many shapes into one flat array.
+    :param data: The [N_i, D] numpy arrays of each shape's vertices
+    :return: The concatenated vertices, and the offset of each shape within them
     """
-    # JPype doesn't know whether to call the float or double.
-    # We make the choice for them using the function arr
-    return jc.RealPoint(arr(coords[::-1]))
+    offsets = np.cumsum([0] + [len(pts) for pts in data])
+    return np.concatenate(data), offsets
 
 
 def _polyshape_to_layer_data(mask):
@@ -45,10 +53,12 @@ def _polyshape_to_layer_data(mask):
 # -- Ellipses -- #
 
 
-def _ellipse_data_to_mask(pts):
-    center = np.mean(pts, axis=0)
-    radii = np.abs(pts[0, :] - center)
-    return jc.ClosedWritableEllipsoid(center[::-1], radii[::-1])
+def _ellipse_data_to_masks(data: List[np.ndarray]) -> List["jc.SuperEllipsoid"]:
+    pts = np.stack(data)
+    centers = np.mean(pts, axis=1)
+    radii = np.abs(pts[:, 0, :] - centers)
+    j_centers, j_radii = _to_java_coords(centers), _to_java_coords(radii)
+    return [jc.ClosedWritableEllipsoid(c, r) for c, r in zip(j_centers, j_radii)]
 
 
 def _ellipse_mask_to_data(mask):
@@ -67,9 +77,7 @@ def _ellipse_mask_to_data(mask):
     priority=Priority.VERY_HIGH,
 )
 def _ellipse_mask_to_layer(mask: "jc.SuperEllipsoid") -> Shapes:
-    layer = Shapes()
-    layer.add_ellipses(_ellipse_mask_to_data(mask))
-    return layer
+    return Shapes(data=[_ellipse_mask_to_data(mask)], shape_type="ellipse")
 
 
 # -- Boxes -- #
@@ -88,17 +96,24 @@ def _is_axis_aligned(points: np.ndarray) -> bool:
     return len(set(x_values)) == 2 and len(set(y_values)) == 2
 
 
-def _rectangle_data_to_mask(points: np.ndarray):
+def _rectangle_data_to_masks(data: List[np.ndarray]) -> List["jc.RealMask"]:
+    masks = [None] * len(data)
     # non-aligned rectangles cannot be represented with a Box
-    if not _is_axis_aligned(points):
-        return _polygon_data_to_mask(points)
-
-    y_values = points[:, 0]
-    x_values = points[:, 1]
-
-    min = arr([np.min(x_values), np.min(y_values)])
-    max = arr([np.max(x_values), np.max(y_values)])
-    return jc.ClosedWritableBox(arr(min), arr(max))
+    is_aligned = [_is_axis_aligned(pts) for pts in data]
+    aligned = [i for i in range(len(data)) if is_aligned[i]]
+    rotated = [i for i in range(len(data)) if not is_aligned[i]]
+    if rotated:
+        polygons = _polygon_data_to_masks([data[i] for i in rotated])
+        for i, polygon in zip(rotated, polygons):
+            masks[i] = polygon
+    if aligned:
+        # NB boxes are 2D, spanning the (Y, X) values of each rectangle
+        pts = np.stack([data[i] for i in aligned])[:, :, :2]
+        j_mins = _to_java_coords(np.min(pts, axis=1))
+        j_maxs = _to_java_coords(np.max(pts, axis=1))
+        for i, lo, hi in zip(aligned, j_mins, j_maxs):
+            masks[i] = jc.ClosedWritableBox(lo, hi)
+    return masks
 
 
 def _rectangle_mask_to_data(mask):
@@ -112,18 +127,25 @@ def _rectangle_mask_to_data(mask):
     predicate=lambda obj: isinstance(obj, jc.Box), priority=Priority.VERY_HIGH
 )
 def _rectangle_mask_to_layer(mask: "jc.Box") -> Shapes:
-    layer = Shapes()
-    layer.add_rectangles(_rectangle_mask_to_data(mask))
-    return layer
+    return Shapes(data=[_rectangle_mask_to_data(mask)], shape_type="rectangle")
 
 
 # -- Polygons -- ##
 
 
-def _polygon_data_to_mask(points):
-    pts = [realPoint_from(x) for x in points]
-    ptList = jc.ArrayList(pts)
-    return jc.ClosedWritablePolygon2D(ptList)
+def _polygon_data_to_masks(data: List[np.ndarray]) -> List["jc.Polygon2D"]:
+    # Transfer the X and Y values of all polygons at once
+    vertices, offsets = _concatenate(data)
+    xs = JArray(JDouble)(np.ascontiguousarray(vertices[:, -1], dtype=np.float64))
+    ys = JArray(JDouble)(np.ascontiguousarray(vertices[:, -2], dtype=np.float64))
+    # NB Arrays.copyOfRange slices each polygon's values within Java
+    return [
+        jc.ClosedWritablePolygon2D(
+            jc.Arrays.copyOfRange(xs, int(start), int(end)),
+            jc.Arrays.copyOfRange(ys, int(start), int(end)),
+        )
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
 
 
 def _polygon_mask_to_data(mask):
@@ -138,18 +160,18 @@ def _polygon_mask_to_data(mask):
     predicate=lambda obj: isinstance(obj, jc.Polygon2D), priority=Priority.VERY_HIGH
 )
 def _polygon_mask_to_layer(mask: "jc.Polygon2D") -> Shapes:
-    layer = Shapes()
-    layer.add_polygons(_polygon_mask_to_data(mask))
-    return layer
+    return Shapes(data=[_polygon_mask_to_data(mask)], shape_type="polygon")
 
 
 # -- Lines -- ##
 
 
-def _line_data_to_mask(points):
-    start = realPoint_from(points[0])
-    end = realPoint_from(points[1])
-    return jc.DefaultWritableLine(start, end)
+def _line_data_to_masks(data: List[np.ndarray]) -> List["jc.Line"]:
+    j_endpoints = _to_java_coords(np.stack(data)[:, :2, :])
+    return [
+        jc.DefaultWritableLine(jc.RealPoint.wrap(e[0]), jc.RealPoint.wrap(e[1]))
+        for e in j_endpoints
+    ]
 
 
 def _line_mask_to_data(mask):
@@ -169,19 +191,22 @@ def _line_mask_to_data(mask):
     predicate=lambda obj: isinstance(obj, jc.Line), priority=Priority.VERY_HIGH
 )
 def _line_mask_to_layer(mask: "jc.Line") -> Shapes:
-    # Create Shapes layer
-    layer = Shapes()
-    layer.add_lines(_line_mask_to_data(mask))
-    return layer
+    return Shapes(data=[_line_mask_to_data(mask)], shape_type="line")
 
 
 # -- Paths -- ##
 
 
-def _path_data_to_mask(points):
-    pts = [realPoint_from(x) for x in points]
-    ptList = jc.ArrayList(pts)
-    return jc.DefaultWritablePolyline(ptList)
+def _path_data_to_masks(data: List[np.ndarray]) -> List["jc.Polyline"]:
+    # Transfer the vertices of all paths at once
+    vertices, offsets = _concatenate(data)
+    j_vertices = _to_java_coords(vertices)
+    # NB RealPoint.wrap uses each double[] without copying it
+    pts = [jc.RealPoint.wrap(v) for v in j_vertices]
+    return [
+        jc.DefaultWritablePolyline(jc.ArrayList(pts[start:end]))
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
 
 
 def _path_mask_to_data(mask):
@@ -196,36 +221,52 @@ def _path_mask_to_data(mask):
     predicate=lambda obj: isinstance(obj, jc.Polyline), priority=Priority.VERY_HIGH
 )
 def _path_mask_to_layer(mask: "jc.Polyline") -> Shapes:
-    layer = Shapes()
-    layer.add_paths(_path_mask_to_data(mask))
-    return layer
+    return Shapes(data=[_path_mask_to_data(mask)], shape_type="path")
 
 
 # -- Shapes / ROITrees -- #
 
 
+def _mask_to_data(mask: "jc.RealMask"):
+    """
+    Converts a RealMask into napari Shapes data.
+    :param mask: The RealMask
+    :return: The shape data and the shape type of the mask
+    """
+    if isinstance(mask, jc.SuperEllipsoid):
+        return _ellipse_mask_to_data(mask), "ellipse"
+    elif isinstance(mask, jc.Box):
+        return _rectangle_mask_to_data(mask), "rectangle"
+    elif isinstance(mask, jc.Polygon2D):
+        return _polygon_mask_to_data(mask), "polygon"
+    elif isinstance(mask, jc.Line):
+        return _line_mask_to_data(mask), "line"
+    elif isinstance(mask, jc.Polyline):
+        return _path_mask_to_data(mask), "path"
+    raise NotImplementedError(f"Cannot convert {mask}: conversion not implemented!")
+
+
 @java_to_py_converter(
     predicate=lambda obj: isinstance(obj, jc.ROITree), priority=Priority.VERY_HIGH
 )
 def _roitree_to_layer(roitree: "jc.ROITree") -> Shapes:
-    layer = Shapes()
     rois = [child.data() for child in roitree.children()]
-    for roi in rois:
-        if isinstance(roi, jc.SuperEllipsoid):
-            layer.add_ellipses(_ellipse_mask_to_data(roi))
-        elif isinstance(roi, jc.Box):
-            layer.add_rectangles(_rectangle_mask_to_data(roi))
-        elif isinstance(roi, jc.Polygon2D):
-            layer.add_polygons(_polygon_mask_to_data(roi))
-        elif isinstance(roi, jc.Line):
-            layer.add_lines(_line_mask_to_data(roi))
-        elif isinstance(roi, jc.Polyline):
-            layer.add_paths(_path_mask_to_data(roi))
-        else:
-            raise NotImplementedError(
-                f"Cannot convert {roi}: conversion not implemented!"
-            )
-    return layer
+    if not rois:
+        return Shapes()
+    data, shape_types = zip(*(_mask_to_data(roi) for roi in rois))
+    # NB construct the layer with all shapes at once, such that napari
+    # triangulates them and emits events only once
+    return Shapes(data=list(data), shape_type=list(shape_types))
+
+
+# NB each function converts all shapes of one type at once
+_data_to_masks: Dict[str, Callable[[List[np.ndarray]], List]] = {
+    "ellipse": _ellipse_data_to_masks,
+    "rectangle": _rectangle_data_to_masks,
+    "polygon": _polygon_data_to_masks,
+    "line": _line_data_to_masks,
+    "path": _path_data_to_masks,
+}
 
 
 @py_to_java_converter(
@@ -233,23 +274,20 @@ def _roitree_to_layer(roitree: "jc.ROITree") -> Shapes:
 )
 def _layer_to_roitree(layer: Shapes) -> "jc.DefaultROITree":
     """Converts a Shapes layer to a RealMask or a list of them."""
-    masks = jc.ArrayList()
-    for pts, shape_type in zip(layer.data, layer.shape_type):
-        if shape_type == "ellipse":
-            shape = _ellipse_data_to_mask(pts)
-        elif shape_type == "rectangle":
-            shape = _rectangle_data_to_mask(pts)
-        elif shape_type == "polygon":
-            shape = _polygon_data_to_mask(pts)
-        elif shape_type == "line":
-            shape = _line_data_to_mask(pts)
-        elif shape_type == "path":
-            shape = _path_data_to_mask(pts)
-        else:
+    # Group shapes by type, such that each type is converted in one batch
+    groups: Dict[str, List[int]] = {}
+    for i, shape_type in enumerate(layer.shape_type):
+        if shape_type not in _data_to_masks:
             raise NotImplementedError(
                 f"Shape type {shape_type} cannot yet be converted!"
             )
-        masks.add(shape)
+        groups.setdefault(shape_type, []).append(i)
+    # Convert each group, preserving the order of the shapes
+    masks = [None] * len(layer.data)
+    for shape_type, indices in groups.items():
+        data = [np.asarray(layer.data[i]) for i in indices]
+        for i, mask in zip(indices, _data_to_masks[shape_type](data)):
+            masks[i] = mask
     rois = jc.DefaultROITree()
-    rois.addROIs(masks)
+    rois.addROIs(jc.ArrayList(masks))
     return rois
@@ -1,5 +1,11 @@
+from collections import OrderedDict
 from functools import lru_cache
+from typing import Optional
+
+import dask.array as da
 import numpy as np
+from dask.array.core import normalize_chunks
+from jpype import JArray, JDouble
 from napari.layers import Labels, Tracks
 from scyjava import JavaClasses, Priority
 
@@ -22,92 +28,251 @@ def trackmate_present():
         return False
 
 
+# NB the number of ROITrees whose verdicts are remembered
+_VERDICT_CACHE_SIZE = 64
+_verdict_cache: OrderedDict = OrderedDict()
+
+
 def track_overlay_predicate(obj):
     """
     Returns True iff obj is a TrackMate Overlay, wrapped into a ROITree.
     """
+    # TrackMate data will be wrapped within a ROITree
+    # NB this check is cheap, and rejects almost every object, so it comes first
+    if not isinstance(obj, jc.ROITree):
+        return False
+    # Reuse the verdict for this ROITree, unless its children have changed
+    key = jc.System.identityHashCode(obj)
+    children = obj.children()
+    n_children = children.size()
+    cached = _verdict_cache.get(key)
+    if cached is not None and cached[0].get() == obj and cached[1] == n_children:
+        _verdict_cache.move_to_end(key)
+        return cached[2]
+
+    verdict = _is_track_overlay(children)
+    # NB the ROITree is held weakly, so the cache never keeps it alive
+    _verdict_cache[key] = (jc.WeakReference(obj), n_children, verdict)
+    _verdict_cache.move_to_end(key)
+    if len(_verdict_cache) > _VERDICT_CACHE_SIZE:
+        _verdict_cache.popitem(last=False)
+    return verdict
+
+
+def _is_track_overlay(children) -> bool:
+    """
+    Returns True iff the children of a ROITree form a TrackMate Overlay.
+    """
+    # More specifically, there must be (at least) two children.
+    if children.size() < 2:
+        return False
     # Prevent ImportErrors by ensuring TrackMate is on the classpath
     if not trackmate_present():
         return False
     # TrackMate data is wrapped in ImageJ Rois - we need ImageJ Legacy
     if not (nij.ij.legacy and nij.ij.legacy.isActive()):
         return False
-    # TrackMate data will be wrapped within a ROITree
-    if not isinstance(obj, jc.ROITree):
-        return False
-    # Where each child is a IJRoiWrapper
-    children = [child.data() for child in obj.children()]
+    has_spots, has_tracks = False, False
     for child in children:
-        if not isinstance(child, jc.IJRoiWrapper):
+        data = child.data()
+        # Where each child is a IJRoiWrapper
+        if not isinstance(data, jc.IJRoiWrapper):
             return False
-    # More specifically, there must be (at least) two IJRoiWrapper children.
-    if len(children) < 2:
-        return False
-    # One must be a SpotOverlay
-    if not any(isinstance(child.getRoi(), jc.SpotOverlay) for child in children):
-        return False
-    # And another is a TrackOverlay
-    if not any(isinstance(child.getRoi(), jc.TrackOverlay) for child in children):
-        return False
-    return True
+        roi = data.getRoi()
+        # One must be a SpotOverlay
+        has_spots = has_spots or isinstance(roi, jc.SpotOverlay)
+        # And another is a TrackOverlay
+        has_tracks = has_tracks or isinstance(roi, jc.TrackOverlay)
+    return has_spots and has_tracks
 
 
 def model_and_image_to_tracks(model: "jc.Model", imp: "jc.ImagePlus"):
-    neighbor_index = model.getTrackModel().getDirectedNeighborIndex()
+    track_model = model.getTrackModel()
+    neighbor_index = track_model.getDirectedNeighborIndex()
 
-    cal = jc.TMUtils.getSpatialCalibration(imp)
+    cal = np.array(jc.TMUtils.getSpatialCalibration(imp), dtype=np.float64)
 
-    spots = []
+    branches = []
     graph = {}
-    branch_ids = {}
-    index = 0
-    for track_id in model.getTrackModel().unsortedTrackIDs(True):
+    for track_id in track_model.unsortedTrackIDs(True):
         # Decompose the track into branches
         branch_decomposition = jc.ConvexBranchesDecomposition.processTrack(
-            track_id, model.getTrackModel(), neighbor_index, True, False
+            track_id, track_model, neighbor_index, True, False
         )
         branch_graph = jc.ConvexBranchesDecomposition.buildBranchGraph(
             branch_decomposition
         )
-        # Pass 1 - assign an id to each branch, and add the spots
+        # Pass 1 - assign an id to each branch, and collect its spots
+        branch_ids = {}
         for branch in branch_graph.vertexSet():
-            branch_ids[branch] = index
-            for spot in branch:
-                x = spot.getFeature(jc.Spot.POSITION_X)
-                y = spot.getFeature(jc.Spot.POSITION_Y)
-                z = spot.getFeature(jc.Spot.POSITION_Z)
-                t = spot.getFeature(jc.Spot.FRAME).intValue()
-                spots.append([index, t, z / cal[2], y / cal[1], x / cal[0]])
-
-            index += 1
+            branch_ids[branch] = len(branches)
+            branches.append(branch.toArray())
         # Pass 2 - establish parent-child relationships
-        for branch in branch_graph.vertexSet():
-            branch_id = branch_ids[branch]
+        for branch, branch_id in branch_ids.items():
             graph[branch_id] = []
             parent_edges = branch_graph.incomingEdgesOf(branch)
             for parent_edge in parent_edges:
                 parent_branch = branch_graph.getEdgeSource(parent_edge)
                 graph[branch_id].append(branch_ids[parent_branch])
 
-    spot_data = np.array(spots)
+    # Extract the position and frame of every spot
+    sizes = [len(spots) for spots in branches]
+    n = sum(sizes)
+    # NB each spot localizes into a row of one double[][], which is then
+    # transferred into NumPy at once. Its frame is returned as a boxed Double,
+    # which JPype unboxes when wrapping it - so each spot costs two calls.
+    positions = JArray.of(np.zeros((n, 3)))
+    frames = np.zeros(n)
+    frame = jc.Spot.FRAME
+    i = 0
+    for spots in branches:
+        for spot in spots:
+            spot.localize(positions[i])
+            frames[i] = spot.getFeature(frame)
+            i += 1
+    positions = np.array(positions, dtype=np.float64).reshape((n, 3))
+
+    # Build the Tracks data - each row is (branch, t, z, y, x)
+    spot_data = np.column_stack(
+        (
+            np.repeat(np.arange(len(branches)), sizes),
+            frames,
+            # NB positions and calibrations are (x, y, z)
+            positions[:, ::-1] / cal[2::-1],
+        )
+    )
     if "Z" not in imp.dims:
         spot_data = np.delete(spot_data, 2, 1)
-        # rois = [np.delete(roi, 2, 1) for roi in rois]
 
     tracks_name = f"{imp.getTitle()}-tracks"
     tracks = Tracks(data=spot_data, graph=graph, name=tracks_name)
     rois_name = f"{imp.getTitle()}-rois"
-    java_label_img = jc.LabelImgExporter.createLabelImagePlus(
-        model, imp, False, False, False
-    )
-    py_label_img = nij.ij.py.from_java(java_label_img)
-    labels = Labels(data=py_label_img.data, name=rois_name)
+    labels = Labels(data=_lazy_label_image(model, imp), name=rois_name)
 
     return (tracks, labels)
 
 
+def _lazy_label_image(model: "jc.Model", imp: "jc.ImagePlus") -> da.Array:
+    """
+    Creates a label image of the spots of a TrackMate model, which is rendered
+    lazily, one timepoint at a time, when napari displays that timepoint.
+
+    Rendering follows TrackMate's LabelImgExporter: spots with a contour
+    (e.g. from the StarDist, Cellpose or thresholding detectors) are drawn as
+    that contour, in 2D, and all other spots as an ellipsoid with the spot's
+    radius. Spots within a visible track are labeled with their track ID plus
+    one. All other spots are labeled uniquely, beyond the largest track label:
+    each timepoint reserves one label per spot, so that its labels are known
+    without visiting the spots of earlier timepoints.
+
+    :param model: The TrackMate model
+    :param imp: The ImagePlus the model was created from
+    :return: A dask array of shape (T, [Z,] Y, X)
+    """
+    cal = np.array(jc.TMUtils.getSpatialCalibration(imp), dtype=np.float64)
+    n_dims = 3 if "Z" in imp.dims else 2
+    shape = [imp.getNFrames(), imp.getNSlices(), imp.getHeight(), imp.getWidth()]
+    if n_dims == 2:
+        del shape[1]
+    spots = model.getSpots()
+    track_model = model.getTrackModel()
+    # NB labels of spots outside of tracks must not collide with track labels
+    offset = max((int(t) for t in track_model.trackIDs(False)), default=-1) + 2
+
+    def track_label(spot) -> Optional[int]:
+        track_id = track_model.trackIDOf(spot)
+        if track_id is None or not track_model.isVisible(track_id):
+            return None
+        return int(track_id) + 1
+
+    # The first label of the spots outside of tracks, per timepoint
+    # NB computed up front, from the number of spots in each timepoint
+    counts = [spots.getNSpots(t, True) for t in range(shape[0])]
+    first_labels = offset + np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    def render_timepoint(block_info=None):
+        t = block_info[None]["chunk-location"][0]
+        labels = np.zeros(block_info[None]["chunk-shape"], dtype=np.uint32)
+        position = JArray(JDouble)(3)
+        next_label = int(first_labels[t])
+        for spot in spots.iterable(t, True):
+            label = track_label(spot)
+            if label is None:
+                label, next_label = next_label, next_label + 1
+            spot.localize(position)
+            roi = spot.getRoi() if n_dims == 2 else None
+            if roi is not None:
+                # Convert contour, relative in calibrated units, to pixels
+                xs = (position[0] + np.asarray(roi.x)) / cal[0]
+                ys = (position[1] + np.asarray(roi.y)) / cal[1]
+                _draw_polygon(labels[0], xs, ys, label)
+            else:
+                radius = float(spot.getFeature(jc.Spot.RADIUS))
+                # Convert (x, y, z) in calibrated units to ([z,] y, x) in pixels
+                center = (np.array(position) / cal)[n_dims - 1 :: -1]
+                radii = (radius / cal)[n_dims - 1 :: -1]
+                _draw_ellipsoid(labels[0], center, radii, label)
+        return labels
+
+    return da.map_blocks(
+        render_timepoint,
+        chunks=normalize_chunks([1] + shape[1:], shape),
+        dtype=np.uint32,
+    )
+
+
+def _draw_ellipsoid(labels: np.ndarray, center, radii, label: int) -> None:
+    """
+    Draws a filled, axis-aligned ellipsoid into a label image, in place.
+    :param labels: The label image
+    :param center: The center of the ellipsoid, in pixels
+    :param radii: The radii of the ellipsoid, in pixels
+    :param label: The label of the ellipsoid
+    """
+    # NB every spot covers at least the pixel containing its center
+    radii = np.maximum(radii, 0.5)
+    lo = np.maximum(np.floor(center - radii).astype(int), 0)
+    hi = np.minimum(np.ceil(center + radii).astype(int) + 1, labels.shape)
+    if np.any(hi <= lo):
+        return
+    box = tuple(slice(a, b) for a, b in zip(lo, hi))
+    grid = np.ogrid[box]
+    inside = sum(((g - c) / r) ** 2 for g, c, r in zip(grid, center, radii)) <= 1
+    labels[box][inside] = label
+
+
+def _draw_polygon(labels: np.ndarray, xs, ys, label: int) -> None:
+    """
+    Draws a filled polygon into a 2D label image, in place.
+
+    Pixels are drawn iff their center lies within the polygon (by the even-odd
+    rule), where the center of pixel (y, x) lies at (y, x).
+
+    :param labels: The (Y, X) label image
+    :param xs: The X coordinates of the polygon vertices, in pixels
+    :param ys: The Y coordinates of the polygon vertices, in pixels
+    :param label: The label of the polygon
+    """
+    xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    lo = np.maximum(np.floor([ys.min(), xs.min()]).astype(int), 0)
+    hi = np.minimum(np.ceil([ys.max(), xs.max()]).astype(int) + 1, labels.shape)
+    if np.any(hi <= lo):
+        return
+    yy, xx = np.mgrid[lo[0] : hi[0], lo[1] : hi[1]]
+    inside = np.zeros(yy.shape, dtype=bool)
+    # Toggle each pixel whose rightward ray crosses each edge
+    for x0, y0, x1, y1 in zip(xs, ys, np.roll(xs, -1), np.roll(ys, -1)):
+        crosses = (y0 > yy) != (y1 > yy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x0 + (yy - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (xx < x_cross)
+    labels[lo[0] : hi[0], lo[1] : hi[1]][inside] = label
+
+
 @java_to_py_converter(
-    predicate=track_overlay_predicate, priority=Priority.EXTREMELY_HIGH
+    predicate=track_overlay_predicate,
+    priority=Priority.EXTREMELY_HIGH,
+    per_instance=True,
 )
 def _trackMate_model_to_tracks(obj: "jc.ROITree"):
     """
@@ -132,10 +297,6 @@ class TrackMateClasses(NijJavaClasses):
     def ConvexBranchesDecomposition(self):
         return "fiji.plugin.trackmate.graph.ConvexBranchesDecomposition"
 
-    @JavaClasses.java_import
-    def LabelImgExporter(self):
-        return "fiji.plugin.trackmate.action.LabelImgExporter"
-
     @JavaClasses.java_import
     def Model(self):
         return "fiji.plugin.trackmate.Model"
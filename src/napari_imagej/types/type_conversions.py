@@ -15,14 +15,22 @@ is left to PyImageJ's to_java function.
 Notable functions included in the module:
     * python_type_of()
         - determines an "equivalent" python type for a given SciJava ModuleItem
+    * build_support_index()
+        - precomputes which type hints can be converted to (and from) the types
+          of all SciJava ModuleItems
 """
 
-from typing import Callable, List, Optional, Tuple, Type
+import json
+import os
+from itertools import chain
+from logging import getLogger
+from time import sleep
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
 from jpype import JObject
-from scyjava import Priority
+from scyjava import Priority, jvm_started
 
-from napari_imagej import nij
+from napari_imagej import nij, settings
 from napari_imagej.java import jc
 from napari_imagej.types.enum_likes import enum_like
 from napari_imagej.types.enums import py_enum_for
@@ -31,6 +39,16 @@ from napari_imagej.widgets.parameter_widgets import widget_supported_java_types
 
 # List of Module Item Converters, along with their priority
 _MODULE_ITEM_CONVERTERS: List[Tuple[Callable, int]] = []
+# Type hints, keyed by (Java type, isInput, isOutput, isRequired)
+_TYPE_HINT_CACHE: Dict[Tuple[Any, bool, bool, bool], Any] = {}
+# Whether the ConvertService supports conversion between two types,
+# keyed by the names of those types
+_SUPPORT_INDEX: Dict[Tuple[str, str], bool] = {}
+# The names of Java types
+_TYPE_NAMES: Dict[Any, str] = {}
+# The number of ModuleItem types indexed between pauses, and the pause (in s)
+_SUPPORT_INDEX_CHUNK = 8
+_SUPPORT_INDEX_PAUSE = 0.05
 
 
 def module_item_converter(
@@ -46,19 +64,31 @@ def module_item_converter(
     def converter(func: Callable):
         """Registers the annotated function with its priority"""
         _MODULE_ITEM_CONVERTERS.append((func, priority))
+        # NB cached type hints may no longer be the best
+        _TYPE_HINT_CACHE.clear()
         return func
 
     return converter
 
 
 def type_hint_for(module_item: "jc.ModuleItem"):
-    """Returns a python type hint for the passed Java ModuleItem."""
-    for converter, _ in sorted(
-        _MODULE_ITEM_CONVERTERS, reverse=True, key=lambda x: x[1]
-    ):
-        converted = converter(module_item)
-        if converted is not None:
-            return converted
+    """
+    Returns a python type hint for the passed Java ModuleItem.
+    NB the type hint depends only on the item's type and I/O kind,
+    so it is computed once for each combination.
+    """
+    key = (
+        module_item.getType(),
+        bool(module_item.isInput()),
+        bool(module_item.isOutput()),
+        bool(module_item.isRequired()),
+    )
+    if key in _TYPE_HINT_CACHE:
+        converted = _TYPE_HINT_CACHE[key]
+    else:
+        converted = _TYPE_HINT_CACHE[key] = _compute_type_hint(module_item)
+    if converted is not None:
+        return converted
     raise ValueError(
         (
             f"Cannot determine python type hint of {module_item.getType()}. "
@@ -68,6 +98,17 @@ def type_hint_for(module_item: "jc.ModuleItem"):
     )
 
 
+def _compute_type_hint(module_item: "jc.ModuleItem"):
+    """Runs each module item converter on module_item, returning the first hint"""
+    for converter, _ in sorted(
+        _MODULE_ITEM_CONVERTERS, reverse=True, key=lambda x: x[1]
+    ):
+        converted = converter(module_item)
+        if converted is not None:
+            return converted
+    return None
+
+
 def _optional_of(p_type: type, item: "jc.ModuleItem") -> type:
     if not p_type:
         return p_type
@@ -201,8 +242,89 @@ def canConvertChecker(item: "jc.ModuleItem") -> Optional[Type]:
     """
     Determines whether imagej can do a conversion from ptype to item's type java_type.
     """
+    return _checkerUsingFunc(item, _supports)
 
-    def isAssignable(from_type, to_type) -> bool:
-        return nij.ij.convert().supports(from_type, to_type)
 
-    return _checkerUsingFunc(item, isAssignable)
+# -- Support index -- #
+
+
+def _type_name(java_type) -> str:
+    name = _TYPE_NAMES.get(java_type)
+    if name is None:
+        name = _TYPE_NAMES[java_type] = str(jc.Types.name(java_type))
+    return name
+
+
+def _supports(from_type, to_type) -> bool:
+    """
+    Returns True iff the ConvertService can convert from_type into to_type.
+    NB the ConvertService is only queried for pairs of types not yet indexed.
+    """
+    key = (_type_name(from_type), _type_name(to_type))
+    supported = _SUPPORT_INDEX.get(key)
+    if supported is None:
+        supported = bool(nij.ij.convert().supports(from_type, to_type))
+        _SUPPORT_INDEX[key] = supported
+    return supported
+
+
+def build_support_index() -> None:
+    """
+    Indexes whether the ConvertService can convert each type hint into
+    (and from) the type of each ModuleItem known to ImageJ.
+    This is slow, and is intended to be run in the background. The types are
+    indexed in chunks, pausing between chunks so that the GUI stays responsive.
+    If settings.cache_type_information is True, the index is loaded from
+    (and saved to) disk.
+    """
+    persist = settings.cache_type_information and not settings._test_mode
+    if persist:
+        _load_support_index()
+    n_indexed = len(_SUPPORT_INDEX)
+    hint_types = [hint.type for hint in type_hints() if hint.type]
+    item_types = {}
+    for info in nij.ij.module().getModules():
+        for item in chain(info.inputs(), info.outputs()):
+            item_type = item.getType()
+            item_types.setdefault(_type_name(item_type), item_type)
+    for i, item_type in enumerate(item_types.values()):
+        # Stop early if the JVM is shutting down
+        if not jvm_started():
+            return
+        for hint_type in hint_types:
+            _supports(hint_type, item_type)
+            _supports(item_type, hint_type)
+        if (i + 1) % _SUPPORT_INDEX_CHUNK == 0:
+            sleep(_SUPPORT_INDEX_PAUSE)
+    getLogger("napari-imagej").debug(
+        f"Indexed {len(_SUPPORT_INDEX)} type conversions for {len(item_types)} types"
+    )
+    if persist and len(_SUPPORT_INDEX) > n_indexed:
+        _save_support_index()
+
+
+def _support_index_file() -> str:
+    key = settings.installation_key(str(nij.ij.getVersion()))
+    return os.path.join(settings.cache_dir(), f"support_index-{key}.json")
+
+
+def _load_support_index() -> None:
+    """Loads the support index saved by this ImageJ installation, if any."""
+    try:
+        with open(_support_index_file()) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    for from_name, to_name, supported in saved.get("supports", []):
+        _SUPPORT_INDEX.setdefault((from_name, to_name), supported)
+
+
+def _save_support_index() -> None:
+    """Saves the support index, keyed by the running ImageJ installation."""
+    # NB other threads may index conversions meanwhile, so take a snapshot
+    saved = {"supports": [[*k, v] for k, v in list(_SUPPORT_INDEX.items())]}
+    try:
+        with open(_support_index_file(), "w") as f:
+            json.dump(saved, f)
+    except Exception as e:
+        getLogger("napari-imagej").debug(f"Could not save the support index: {e}")
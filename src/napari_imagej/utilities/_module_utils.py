@@ -7,28 +7,115 @@ There are a few functions that are designed for use by graphical widgets, namely
         - converts a SciJava module into a Python function
     * execute_function_modally(viewer, name, function, param_options)
         - executes a Python function, obtaining inputs through a modal dialog
+    * run_module_batch(info, batch_input, batch, axis, inputs)
+        - executes a SciJava module over each slice of a layer, or each of
+          many layers, stacking the outputs
     * info_for(searchResult)
         - converts a SciJava SearchResult to a ModuleInfo
 """
 
+import os
+import pickle
+from concurrent.futures import Future
+from copy import deepcopy
 from inspect import Parameter, Signature, _empty, isclass, signature
 from logging import getLogger
+from threading import Lock
 from time import perf_counter
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 from jpype import JException, JImplements, JOverride
 from magicgui.widgets import Container, Label, LineEdit, Table, Widget, request_values
-from napari.layers import Layer
+from napari.layers import Image, Labels, Layer
+from napari.utils import progress
 from napari.utils._magicgui import get_layers
 from pandas import DataFrame
-from scyjava import JavaIterable, JavaList, JavaMap, JavaSet, is_arraylike, jstacktrace
-
-from napari_imagej import nij
+from scyjava import (
+    JavaIterable,
+    JavaList,
+    JavaMap,
+    JavaSet,
+    is_arraylike,
+    jstacktrace,
+    when_jvm_stops,
+)
+
+from napari_imagej import nij, settings
 from napari_imagej.java import jc
 from napari_imagej.types.type_conversions import type_hint_for
 from napari_imagej.types.type_utils import type_displayable_in_napari
 from napari_imagej.types.widget_mappings import preferred_widget_for
+from napari_imagej.utilities.conversion_cache import conversion_cache
+from napari_imagej.utilities.module_executor import module_executor
 from napari_imagej.utilities.progress_manager import pm
+from napari_imagej.widgets.parameter_widgets import CONVENTIONAL_DIMS
+
+
+class _ProcessorPool:
+    """
+    A pool of SciJava processor plugins, shared across module runs.
+
+    The processor plugins are discovered once. Stateless processors are then
+    shared between runs, while Cancelable processors (e.g. every
+    PreprocessorPlugin) keep their cancel state, so each run gets fresh
+    instances of them. Otherwise, concurrent runs could cancel each other.
+
+    NB as every PreprocessorPlugin is Cancelable, the pool of preprocessors
+    saves only their discovery (and sorting), not their instantiation; only
+    postprocessors are actually shared.
+    """
+
+    def __init__(
+        self,
+        plugin_type: Callable[[], "jc.Class"],
+        excluded: Callable[[], Tuple["jc.Class", ...]] = lambda: (),
+    ):
+        """
+        :param plugin_type: supplies the type of processor plugin to pool
+        :param excluded: supplies the processor types that should not be pooled
+        """
+        self._plugin_type = plugin_type
+        self._excluded = excluded
+        # The processors, in priority order, as (PluginInfo, shared instance),
+        # where the shared instance is None for stateful processors
+        self._processors: Optional[List[Tuple["jc.PluginInfo", Any]]] = None
+
+    def instances(self) -> "jc.ArrayList":
+        """
+        Gets the processors for one module run.
+        :return: a new list of the processors, in priority order
+        """
+        if self._processors is None:
+            excluded = self._excluded()
+            processors = []
+            for info in nij.ij.plugin().getPluginsOfType(self._plugin_type()):
+                processor = nij.ij.plugin().createInstance(info)
+                if processor is None or type(processor) in excluded:
+                    continue
+                if isinstance(processor, jc.Cancelable):
+                    processor = None
+                processors.append((info, processor))
+            self._processors = processors
+        return jc.ArrayList(
+            [
+                nij.ij.plugin().createInstance(info) if p is None else p
+                for info, p in self._processors
+            ]
+        )
+
+
+_preprocessors = _ProcessorPool(lambda: jc.PreprocessorPlugin)
 
 
 def _preprocess_to_harvester(module) -> List["jc.PreprocessorPlugin"]:
@@ -44,7 +131,7 @@ def _preprocess_to_harvester(module) -> List["jc.PreprocessorPlugin"]:
     :return: The list of preprocessors that have not yet run.
     """
 
-    preprocessors = nij.ij.plugin().createInstancesOfType(jc.PreprocessorPlugin)
+    preprocessors = _preprocessors.instances()
     for i, preprocessor in enumerate(preprocessors):
         # if preprocessor is an InputHarvester, stop and return the remaining list
         if isinstance(preprocessor, jc.InputHarvester):
@@ -437,15 +524,161 @@ def _add_scijava_metadata(
     return metadata
 
 
-def _get_postprocessors():
+class _ModuleSignature(NamedTuple):
+    """The metadata added to a module function, to describe its module."""
+
+    name: str
+    signature: Signature
+    annotations: Dict[str, Any]
+    magic_kwargs: Dict[str, Dict[str, Any]]
+
+
+# Module signatures, keyed by module identifier and unresolved inputs
+_SIGNATURE_CACHE: Dict[Tuple[str, Tuple[str, ...]], _ModuleSignature] = {}
+# Pickled module signatures, loaded from disk
+_PICKLED_SIGNATURES: Optional[Dict[Tuple[str, Tuple[str, ...]], bytes]] = None
+# The file the pickled module signatures are saved to, once loaded
+_SIGNATURE_FILE: Optional[str] = None
+# Whether module signatures were pickled since they were loaded
+_signatures_changed: bool = False
+
+
+def _signature_key(
+    module: "jc.Module",
+    info: "jc.ModuleInfo",
+    unresolved_inputs: List["jc.ModuleItem"],
+) -> Optional[Tuple[str, Tuple[str, ...]]]:
     """
-    Returns the list of PostprocessorPlugins that should be used
-    on SciJava Modules from napari-imagej
+    Gets the key of a module signature, or None if it cannot be cached.
+    NB the types of the inputs are included, as some modules (e.g. scripts)
+    can change their inputs without changing their identifiers.
     """
-    # Discover all postprocessors
-    postprocessors = nij.ij.plugin().createInstancesOfType(jc.PostprocessorPlugin)
+    identifier = info.getIdentifier()
+    if identifier is None:
+        return None
+    # Initializers and dynamic commands can change an input's default value,
+    # choices, bounds or even existence with each new module instance
+    if info.getInitializer() or any(i.getInitializer() for i in info.inputs()):
+        return None
+    if isinstance(module.getDelegateObject(), jc.DynamicCommand):
+        return None
+    return (
+        str(identifier),
+        tuple(f"{i.getName()}:{i.getType()}" for i in unresolved_inputs),
+    )
+
+
+def _persist_signatures() -> bool:
+    return settings.cache_type_information and not settings._test_mode
+
+
+def _signature_file() -> str:
+    """Gets the file caching module signatures for the running installation."""
+    key = settings.installation_key(str(nij.ij.getVersion()))
+    return os.path.join(settings.cache_dir(), f"signatures-{key}.pickle")
+
+
+def _pickled_signatures() -> Dict[Tuple[str, Tuple[str, ...]], bytes]:
+    """
+    Lazily loads the module signatures cached on disk.
+    NB any signatures cached during this session are saved at shutdown.
+    """
+    global _PICKLED_SIGNATURES, _SIGNATURE_FILE
+    if _PICKLED_SIGNATURES is None:
+        _PICKLED_SIGNATURES = {}
+        if _persist_signatures():
+            _SIGNATURE_FILE = _signature_file()
+            try:
+                with open(_SIGNATURE_FILE, "rb") as f:
+                    _PICKLED_SIGNATURES = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            when_jvm_stops(_save_signatures)
+    return _PICKLED_SIGNATURES
+
+
+def _cached_signature(key) -> Optional[_ModuleSignature]:
+    """Gets the module signature cached for key, from memory or from disk."""
+    cached = _SIGNATURE_CACHE.get(key)
+    if cached is None and key in _pickled_signatures():
+        try:
+            cached = _SIGNATURE_CACHE[key] = pickle.loads(_pickled_signatures()[key])
+        except Exception:
+            # NB e.g. autogenerated Enums cannot be unpickled in a new session
+            del _pickled_signatures()[key]
+    return cached
+
+
+def _cache_signature(key, module_signature: _ModuleSignature) -> None:
+    """Caches a module signature in memory and, if possible, on disk."""
+    global _signatures_changed
+    _SIGNATURE_CACHE[key] = module_signature
+    if not _persist_signatures():
+        return
+    try:
+        _pickled_signatures()[key] = pickle.dumps(module_signature)
+    except Exception:
+        # NB some annotations (e.g. autogenerated Enums) cannot be pickled
+        return
+    _signatures_changed = True
+
+
+def _save_signatures() -> None:
+    """Saves the pickled module signatures, if changed, replacing the file."""
+    global _signatures_changed
+    if not _signatures_changed or _SIGNATURE_FILE is None:
+        return
+    # NB write a temporary file first, such that the file is never left partial
+    temp_file = f"{_SIGNATURE_FILE}.tmp"
+    try:
+        with open(temp_file, "wb") as f:
+            pickle.dump(_PICKLED_SIGNATURES, f)
+        os.replace(temp_file, _SIGNATURE_FILE)
+        _signatures_changed = False
+    except OSError as e:
+        getLogger("napari-imagej").debug(f"Could not save module signatures: {e}")
 
-    problematic_postprocessors = (
+
+def _add_module_metadata(
+    execute_module: Callable,
+    module: "jc.Module",
+    info: "jc.ModuleInfo",
+    unresolved_inputs: List["jc.ModuleItem"],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Adds the napari and SciJava metadata describing a module to its function.
+    The metadata is cached, such that later functions for the same module
+    skip introspecting the module.
+    :return: the magicgui keyword arguments for the function's parameters
+    """
+    key = _signature_key(module, info, unresolved_inputs)
+    cached = None if key is None else _cached_signature(key)
+    if cached is None:
+        _add_napari_metadata(execute_module, info, unresolved_inputs)
+        magic_kwargs = _add_scijava_metadata(
+            unresolved_inputs, execute_module.__annotation__
+        )
+        cached = _ModuleSignature(
+            name=execute_module.__name__,
+            signature=execute_module.__signature__,
+            annotations=execute_module.__annotation__,
+            magic_kwargs=magic_kwargs,
+        )
+        if key is not None:
+            _cache_signature(key, cached)
+    else:
+        execute_module.__doc__ = f"Invoke ImageJ2's {cached.name}"
+        execute_module.__name__ = cached.name
+        execute_module.__qualname__ = cached.name
+        execute_module.__signature__ = cached.signature
+        execute_module._info = info  # type: ignore
+        execute_module.__annotation__ = dict(cached.annotations)  # type: ignore
+    # NB magicgui may modify the keyword arguments, so each function gets a copy
+    return deepcopy(cached.magic_kwargs)
+
+
+def _problematic_postprocessors() -> Tuple["jc.Class", ...]:
+    return (
         # HACK: This particular postprocessor is trying to create a Display
         # for lots of different types. Some of those types (specifically
         # ImgLabelings) make this guy throw Exceptions. We are going to ignore
@@ -457,14 +690,19 @@ def _get_postprocessors():
         jc.ResultsPostprocessor,
     )
 
-    itr = postprocessors.iterator()
-    while itr.hasNext():
-        postprocessor = itr.next()
-        if type(postprocessor) in problematic_postprocessors:
-            itr.remove()
 
+_postprocessors = _ProcessorPool(
+    lambda: jc.PostprocessorPlugin, _problematic_postprocessors
+)
+
+
+def _get_postprocessors():
+    """
+    Returns the list of PostprocessorPlugins that should be used
+    on SciJava Modules from napari-imagej
+    """
     # Return non-problematic postprocessors
-    return postprocessors
+    return _postprocessors.instances()
 
 
 def functionify_module_execution(
@@ -502,10 +740,13 @@ def functionify_module_execution(
             start_time = perf_counter()
 
             # Create user input map
-            resolved_java_args = nij.ij.py.jargs(*user_resolved_inputs)
-            input_map = jc.HashMap()
-            for module_item, input in zip(unresolved_inputs, resolved_java_args):
-                input_map.put(module_item.getName(), input)
+            # NB inputs are converted once the module is dispatched, such that
+            # queued modules do not hold converted copies of their inputs
+            def input_map() -> "jc.HashMap":
+                inputs = jc.HashMap()
+                for item, input in zip(unresolved_inputs, user_resolved_inputs):
+                    inputs.put(item.getName(), _input_to_java(item, input))
+                return inputs
 
             # Create postprocessors
             postprocessors: "jc.ArrayList" = _get_postprocessors()
@@ -525,18 +766,18 @@ def functionify_module_execution(
             # We do it here, because it can be done on the GUI thread,
             # before the module can update it through its own execution.
             pm.init_progress(module)
-            # Run the module asynchronously using the ModuleService
-            nij.ij.module().run(
+            # Run the module asynchronously, on a Java thread
+            future = module_executor.submit(
                 module,
                 remaining_preprocessors,
                 postprocessors,
                 input_map,
             )
+            future.add_done_callback(lambda f: _report_module_errors(module, f))
 
         # Add metadata for widget creation
-        _add_napari_metadata(module_execute, info, unresolved_inputs)
-        magic_kwargs = _add_scijava_metadata(
-            unresolved_inputs, module_execute.__annotation__
+        magic_kwargs = _add_module_metadata(
+            module_execute, module, info, unresolved_inputs
         )
 
         return (module_execute, magic_kwargs)
@@ -545,6 +786,245 @@ def functionify_module_execution(
         raise Exception(f"Caught Java Exception\n\n {jstacktrace(exc)}") from None
 
 
+def _report_module_errors(module: "jc.Module", future: Future) -> None:
+    """
+    Reports the failure of a module execution, if it failed.
+    NB errors thrown by the module itself are also shown by the
+    ModuleErroredEvent; this catches the errors around it (e.g. a rejected
+    execution, or an input that could not be converted).
+    :param module: the executed module
+    :param future: the Future of its execution
+    """
+    if future.cancelled() or (exc := future.exception()) is None:
+        return
+    # NB the module may never have run, so its progress bar must be closed here
+    pm.close(module)
+    details = jstacktrace(exc) if isinstance(exc, JException) else str(exc)
+    getLogger("napari-imagej").error(
+        f"Error executing {module.getInfo().getTitle()}:\n{details}"
+    )
+
+
+def _input_to_java(item: "jc.ModuleItem", value: Any) -> Any:
+    """
+    Converts a module input into Java.
+
+    Layers are converted through the conversion cache, such that a layer
+    feeding many modules is converted once. Layers passed to items that are
+    also outputs are always converted afresh, as the module may modify them.
+
+    :param item: the ModuleItem receiving value
+    :param value: the input value
+    :return: the Java object to pass to the module
+    """
+    if isinstance(value, Layer) and not item.isOutput():
+        return conversion_cache.to_java(value)
+    return nij.ij.py.to_java(value)
+
+
+def _batch_axis(layer: Layer, axis: Union[int, str]) -> int:
+    """
+    Finds the index of axis within the data of layer.
+    :param layer: the layer to iterate over
+    :param axis: the axis index, or the axis name (e.g. "Time", "Z", "Channel")
+    :return: the axis index
+    """
+    ndim = layer.data.ndim
+    if isinstance(axis, str):
+        dims = CONVENTIONAL_DIMS[ndim] if ndim < len(CONVENTIONAL_DIMS) else []
+        if axis not in dims:
+            raise ValueError(f"{layer.name} has no {axis} axis")
+        axis = dims.index(axis)
+    if not -ndim <= axis < ndim:
+        raise ValueError(f"{layer.name} has no axis {axis}")
+    return axis % ndim
+
+
+def _batch_slices(layer: Layer, axis: int) -> List[Layer]:
+    """Splits an Image or Labels layer into one layer per index along axis."""
+    if not isinstance(layer, (Image, Labels)) or layer.multiscale:
+        raise ValueError(f"Cannot iterate over {layer.name}")
+    layer_type = layer.as_layer_data_tuple()[2]
+    return [
+        Layer.create(
+            np.take(layer.data, i, axis=axis),
+            {"name": f"{layer.name} [{i}]"},
+            layer_type,
+        )
+        for i in range(layer.data.shape[axis])
+    ]
+
+
+def _stack_batch_outputs(
+    outputs: List[Tuple[List[Layer], List[Tuple[str, Any]]]], axis: int
+) -> Tuple[List[Layer], List[Tuple[str, Any]]]:
+    """
+    Stitches the outputs of a batch together.
+    Image and Labels outputs of the same name and shape are stacked along axis;
+    all other outputs are returned individually, named by their batch index.
+    """
+    layers: Dict[str, List[Layer]] = {}
+    widget_outputs = []
+    for i, (layer_outputs, widget_output) in enumerate(outputs):
+        for layer in layer_outputs:
+            layers.setdefault(layer.name, []).append(layer)
+        widget_outputs.extend((f"{name} [{i}]", v) for name, v in widget_output)
+
+    layer_outputs = []
+    for name, batch in layers.items():
+        first = batch[0]
+        stackable = len(batch) == len(outputs) and all(
+            type(layer) is type(first)
+            and isinstance(layer, (Image, Labels))
+            and not layer.multiscale
+            and layer.data.shape == first.data.shape
+            for layer in batch
+        )
+        if stackable:
+            data = np.stack(
+                [np.asarray(layer.data) for layer in batch],
+                axis=min(axis, first.data.ndim),
+            )
+            layer_type = first.as_layer_data_tuple()[2]
+            layer_outputs.append(Layer.create(data, {"name": name}, layer_type))
+        else:
+            for i, layer in enumerate(batch):
+                layer.name = f"{name} [{i}]"
+                layer_outputs.append(layer)
+    return layer_outputs, widget_outputs
+
+
+def run_module_batch(
+    info: "jc.ModuleInfo",
+    batch_input: str,
+    batch: Union[Layer, Sequence[Any]],
+    axis: Optional[Union[int, str]] = None,
+    inputs: Optional[Dict[str, Any]] = None,
+) -> "Future[Tuple[List[Layer], List[Tuple[str, Any]]]]":
+    """
+    Executes a SciJava module once for each element of a batch.
+
+    The batch is either a list of inputs (e.g. layers), or a single layer
+    split into slices along axis (e.g. each timepoint of a movie). Executions
+    run through the module executor, at most settings.max_concurrent_modules
+    at a time. Progress is reported by a single progress bar for the whole
+    batch. This function returns immediately; if any execution fails, or the
+    returned Future is canceled, the remaining executions are canceled.
+
+    :param info: the ModuleInfo of the module to execute
+    :param batch_input: the name of the module input receiving each element
+    :param batch: the list of inputs, or the layer to slice
+    :param axis: if batch is a layer, the axis to slice it along - either
+        the axis index, or its name (e.g. "Time", "Z", "Channel")
+    :param inputs: the inputs shared by every execution of the module
+    :return: a Future completed with the layer outputs, with those from each
+        execution stacked along axis, and the non-layer outputs, named by
+        their batch index
+    """
+    if isinstance(batch, Layer):
+        if axis is None:
+            raise ValueError("An axis is required to iterate over a layer")
+        axis = _batch_axis(batch, axis)
+        elements = _batch_slices(batch, axis)
+    else:
+        axis = 0
+        elements = list(batch)
+    inputs = {} if inputs is None else inputs
+    shared_items = [info.getInput(name) for name in inputs]
+    java_inputs = {
+        item.getName(): _input_to_java(item, value)
+        for item, value in zip(shared_items, inputs.values())
+    }
+
+    result: Future = Future()
+    outputs = [None] * len(elements)
+    # The Futures of the submitted executions
+    executions: List[Future] = []
+    lock = Lock()
+    n_started, n_finished = 0, 0
+    prog = progress(desc=f"{info.getTitle()} (batch)", total=len(elements))
+
+    def start_next():
+        nonlocal n_started
+        with lock:
+            if result.done() or n_started == len(elements):
+                return
+            i, n_started = n_started, n_started + 1
+        try:
+            module = nij.ij.module().createModule(info)
+            remaining_preprocessors = _preprocess_to_harvester(module)
+            _preprocess_napari_imagej(module)
+
+            def input_map() -> "jc.HashMap":
+                inputs = jc.HashMap()
+                for name, value in java_inputs.items():
+                    inputs.put(name, value)
+                inputs.put(batch_input, nij.ij.py.to_java(elements[i]))
+                return inputs
+
+            execution = module_executor.submit(
+                module, remaining_preprocessors, _get_postprocessors(), input_map
+            )
+        except Exception as exc:
+            fail(exc)
+            return
+        with lock:
+            executions.append(execution)
+            # NB the batch may have ended during submission
+            if result.done():
+                execution.cancel()
+        execution.add_done_callback(lambda f: finished(i, module, f))
+
+    def finished(i: int, module: "jc.Module", execution: Future):
+        nonlocal n_finished
+        if execution.cancelled():
+            return
+        if (exc := execution.exception()) is not None:
+            fail(exc)
+            return
+        # NB outputs that were also inputs are returned only if they came
+        # from the batch, as they were (potentially) modified.
+        outputs[i] = _pure_module_outputs(module, shared_items)
+        prog.update()
+        with lock:
+            n_finished += 1
+            done = n_finished == len(elements)
+        if done:
+            succeed()
+        else:
+            start_next()
+
+    def succeed():
+        with lock:
+            if result.done():
+                return
+            result.set_result(_stack_batch_outputs(outputs, axis))
+        prog.close()
+
+    def fail(exc: BaseException):
+        with lock:
+            if result.done():
+                return
+            if isinstance(exc, JException):
+                exc = Exception(f"Caught Java Exception\n\n {jstacktrace(exc)}")
+            result.set_exception(exc)
+        cancel()
+
+    def cancel():
+        # NB executions that are already running cannot be canceled
+        with lock:
+            for execution in executions:
+                execution.cancel()
+        prog.close()
+
+    result.add_done_callback(lambda f: f.cancelled() and cancel())
+    if not elements:
+        succeed()
+    for _ in range(module_executor.max_concurrency()):
+        start_next()
+    return result
+
+
 def _request_values_args(
     func: Callable, param_options: Dict[str, Dict]
 ) -> Dict[str, Dict]:
@@ -0,0 +1,143 @@
+"""
+A cache of the Java objects converted from napari layers, reused while the
+layers are unchanged.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from napari.layers import Layer
+
+from napari_imagej import nij
+from napari_imagej.utilities.transfers import nbytes_of
+
+# NB the number of bytes of layer data whose conversions are remembered
+_CONVERSION_CACHE_BYTES = 1 << 30
+
+
+class ConversionCache:
+    """Remembers the Java objects converted from napari layers.
+
+    Each layer is versioned by a counter, bumped by the layer's data events.
+    A conversion is reused for as long as its layer stays at the version it
+    was converted from, such that a layer feeding many modules in a row is
+    converted only once. Conversions are remembered for layers holding at
+    most max_bytes of data in total (as a copied conversion holds as many
+    bytes in Java, and a shared one keeps its data alive); the least recently
+    used conversion is evicted first.
+
+    NB Setting the data of a layer emits a data event, while editing its data
+    in place does not. Layers whose data is shared with ImageJ (i.e. most
+    NumPy arrays) reflect such edits anyway; for other layers, call
+    invalidate(layer) after editing their data in place.
+    """
+
+    def __init__(self, max_bytes: int = _CONVERSION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        # Conversions, keyed by layer identity,
+        # as (layer, version, Java object, bytes)
+        self._cache: OrderedDict = OrderedDict()
+        self._nbytes = 0
+        # Watched layers, and their data versions, keyed by layer identity
+        self._versions: Dict[int, Tuple[Layer, int]] = {}
+
+    def to_java(self, layer: Layer) -> Any:
+        """
+        Converts a napari layer into Java, reusing its previous conversion
+        if its data has not changed since.
+        :param layer: the napari layer
+        :return: the Java object converted from layer
+        """
+        key = id(layer)
+        with self._lock:
+            cached = self._cache.get(key)
+            if (
+                cached is not None
+                and cached[0] is layer
+                and cached[1] == self._version(key)
+            ):
+                self._cache.move_to_end(key)
+                return cached[2]
+            version = self._watch(layer)
+        nbytes = nbytes_of(layer.data)
+
+        # NB if the data changes during conversion, the version is bumped,
+        # and this conversion is never reused
+        try:
+            j_obj = nij.ij.py.to_java(layer)
+        except Exception:
+            with self._lock:
+                if key not in self._cache:
+                    self._unwatch(layer)
+            raise
+        with self._lock:
+            # NB the layer may have been invalidated during conversion
+            if self._version(key) is not None:
+                self._discard(key)
+                if nbytes > self.max_bytes:
+                    # NB such a conversion would evict all others
+                    self._unwatch(layer)
+                    return j_obj
+                self._cache[key] = (layer, version, j_obj, nbytes)
+                self._nbytes += nbytes
+                while self._nbytes > self.max_bytes:
+                    evicted = next(iter(self._cache.values()))[0]
+                    self._discard(id(evicted))
+                    self._unwatch(evicted)
+        return j_obj
+
+    def invalidate(self, layer: Optional[Layer] = None) -> None:
+        """
+        Forgets the conversion of a napari layer.
+        :param layer: the napari layer, or None to forget all conversions
+        """
+        with self._lock:
+            if layer is None:
+                for watched, _ in list(self._versions.values()):
+                    self._unwatch(watched)
+                self._cache.clear()
+                self._nbytes = 0
+            else:
+                self._unwatch(layer)
+                if self._cache.get(id(layer), (None,))[0] is layer:
+                    self._discard(id(layer))
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _discard(self, key: int) -> None:
+        # NB the lock must be held
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            self._nbytes -= cached[3]
+
+    def _version(self, key: int) -> Optional[int]:
+        # NB the lock must be held
+        watched = self._versions.get(key)
+        return None if watched is None else watched[1]
+
+    def _watch(self, layer: Layer) -> int:
+        # NB the lock must be held
+        key = id(layer)
+        if self._versions.get(key, (None,))[0] is not layer:
+            self._versions[key] = (layer, 0)
+            layer.events.data.connect(self._bump)
+        return self._versions[key][1]
+
+    def _unwatch(self, layer: Layer) -> None:
+        # NB the lock must be held
+        if self._versions.get(id(layer), (None,))[0] is layer:
+            del self._versions[id(layer)]
+            layer.events.data.disconnect(self._bump)
+
+    def _bump(self, event) -> None:
+        key = id(event.source)
+        with self._lock:
+            watched = self._versions.get(key)
+            if watched is not None and watched[0] is event.source:
+                self._versions[key] = (watched[0], watched[1] + 1)
+
+
+conversion_cache = ConversionCache()
@@ -4,6 +4,7 @@ napari-imagej functionality
 """
 
 from logging import getLogger
+from typing import Dict
 
 from jpype import JImplements, JOverride
 from qtpy.QtCore import Signal
@@ -45,6 +46,46 @@ class ProgressBarListener(object):
         return isinstance(other, ProgressBarListener)
 
 
+@JImplements(["org.scijava.event.EventSubscriber"], deferred=True)
+class DatasetUpdatedListener(object):
+    def __init__(self, updated_signal: Signal):
+        self.updated_signal = updated_signal
+
+    @JOverride
+    def onEvent(self, event):
+        self.updated_signal.emit(event.getObject())
+
+    @JOverride
+    def getEventClass(self):
+        return jc.DatasetUpdatedEvent.class_
+
+    @JOverride
+    def equals(self, other):
+        return isinstance(other, DatasetUpdatedListener)
+
+
+@JImplements(["ij.ImageListener"], deferred=True)
+class ImageUpdatedListener(object):
+    """Counts the updates (e.g. by ImageJ commands) of each ImagePlus."""
+
+    def __init__(self):
+        # The number of updates of each open ImagePlus, keyed by ImagePlus ID
+        self.updates: Dict[int, int] = {}
+
+    @JOverride
+    def imageOpened(self, imp):
+        pass
+
+    @JOverride
+    def imageClosed(self, imp):
+        self.updates.pop(int(imp.getID()), None)
+
+    @JOverride
+    def imageUpdated(self, imp):
+        key = int(imp.getID())
+        self.updates[key] = self.updates.get(key, 0) + 1
+
+
 @JImplements(["org.scijava.event.EventSubscriber"], deferred=True)
 class UIShownListener(object):
     def __init__(self):
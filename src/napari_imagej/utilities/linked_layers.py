@@ -0,0 +1,155 @@
+"""
+Links between napari Image layers and the ImageJ2 Datasets sharing their data.
+"""
+
+from logging import getLogger
+from threading import RLock
+from typing import Any, Dict, Optional, Tuple
+
+from napari.layers import Image
+from qtpy.QtCore import QObject, Signal
+
+from napari_imagej import nij
+from napari_imagej.java import jc
+from napari_imagej.types.converters.images import _shareable_data
+from napari_imagej.utilities.event_subscribers import DatasetUpdatedListener
+from napari_imagej.utilities.events import subscribe
+
+
+class LinkedLayers(QObject):
+    """Links napari Image layers with ImageJ2 Datasets sharing one buffer.
+
+    Neither side of a link is ever re-converted. Instead, changes on one side
+    are announced to the other: a DatasetUpdatedEvent for a linked Dataset
+    (e.g. from an ImageJ command) refreshes its layer, re-reading only the
+    displayed slice. Editing the data of a linked layer in place emits no
+    napari event, so such edits are announced by calling update(layer) (or
+    by setting the layer's data to the same array), which publishes a
+    DatasetUpdatedEvent for its Dataset, refreshing ImageJ's displays.
+
+    Layers whose data ImageJ cannot wrap in place (e.g. dask arrays) cannot be
+    linked. Setting a new data array on a linked layer breaks its link, as the
+    Dataset still wraps the previous array.
+
+    link(...) and unlink(...) must be called from the GUI thread.
+    """
+
+    # Emitted with each updated Dataset, from any thread
+    _dataset_updated = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        # Links, keyed by Dataset identity, as (Dataset, layer, shared data)
+        self._links: Dict[int, Tuple["jc.Dataset", Image, Any]] = {}
+        self._lock = RLock()
+        # Datasets whose updates are being published from napari
+        self._publishing = set()
+        self._listener: Optional[DatasetUpdatedListener] = None
+        self._dataset_updated.connect(self._refresh_layer)
+
+    def link(self, layer: Image) -> "jc.Dataset":
+        """
+        Converts a napari Image layer into a Dataset sharing its data.
+
+        If the layer is already linked, its linked Dataset is returned.
+
+        :param layer: the napari Image layer
+        :return: the Dataset linked with layer
+        :raises ValueError: if layer cannot be linked
+        """
+        if (dataset := self.dataset(layer)) is not None:
+            return dataset
+        if layer.multiscale:
+            raise ValueError(f"{layer.name} is multiscale, and cannot be linked")
+        if _shareable_data(layer.data)[1] != "shared":
+            raise ValueError(f"The data of {layer.name} cannot be shared with ImageJ")
+
+        with self._lock:
+            # NB another thread may have linked the layer meanwhile
+            if (dataset := self.dataset(layer)) is not None:
+                return dataset
+            if self._listener is None:
+                self._listener = DatasetUpdatedListener(self._dataset_updated)
+                subscribe(nij.ij, self._listener)
+            dataset = nij.ij.py.to_java(layer)
+            self._links[int(jc.System.identityHashCode(dataset))] = (
+                dataset,
+                layer,
+                layer.data,
+            )
+        layer.events.data.connect(self._layer_changed)
+        return dataset
+
+    def unlink(self, layer: Image) -> None:
+        """
+        Removes the link of a napari Image layer, if it is linked.
+        :param layer: the napari Image layer
+        """
+        with self._lock:
+            for key, (_, linked, _) in list(self._links.items()):
+                if linked is layer:
+                    del self._links[key]
+                    layer.events.data.disconnect(self._layer_changed)
+
+    def update(self, layer: Image) -> None:
+        """
+        Announces edits to the data of a linked napari Image layer to ImageJ,
+        refreshing its displays. Call this after editing the data in place.
+        :param layer: the napari Image layer
+        """
+        for key, (dataset, linked, data) in list(self._links.items()):
+            if linked is layer and layer.data is data:
+                self._publish(key, dataset)
+
+    def dataset(self, layer: Image) -> Optional["jc.Dataset"]:
+        """
+        Finds the Dataset linked with a napari Image layer.
+        :param layer: the napari Image layer
+        :return: the linked Dataset, or None if layer is not linked
+        """
+        for dataset, linked, _ in list(self._links.values()):
+            if linked is layer:
+                return dataset
+        return None
+
+    def layer(self, dataset: "jc.Dataset") -> Optional[Image]:
+        """
+        Finds the napari Image layer linked with a Dataset.
+        :param dataset: the Dataset
+        :return: the linked napari Image layer, or None if dataset is not linked
+        """
+        link = self._links.get(int(jc.System.identityHashCode(dataset)))
+        if link is None or link[0] != dataset:
+            return None
+        return link[1]
+
+    def _layer_changed(self, event):
+        layer = event.source
+        for key, (dataset, linked, data) in list(self._links.items()):
+            if linked is not layer:
+                continue
+            if layer.data is not data:
+                getLogger("napari-imagej").debug(
+                    f"Unlinking {layer.name}, as its data was replaced"
+                )
+                self.unlink(layer)
+                return
+            self._publish(key, dataset)
+
+    def _publish(self, key: int, dataset: "jc.Dataset"):
+        # Announce the change to ImageJ, without refreshing the layer again
+        self._publishing.add(key)
+        try:
+            dataset.update()
+        finally:
+            self._publishing.discard(key)
+
+    def _refresh_layer(self, dataset: "jc.Dataset"):
+        key = int(jc.System.identityHashCode(dataset))
+        if key in self._publishing:
+            return
+        if (layer := self.layer(dataset)) is not None:
+            layer.refresh()
+
+
+linked_layers = LinkedLayers()
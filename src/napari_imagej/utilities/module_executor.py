@@ -0,0 +1,106 @@
+from collections import deque
+from concurrent.futures import Future
+from threading import Lock
+from typing import Callable, Deque, Tuple, Union
+
+from napari_imagej import nij, settings
+from napari_imagej.java import jc
+
+
+class ModuleExecutor:
+    """Runs SciJava Modules concurrently, returning Python Futures.
+
+    At most settings.max_concurrent_modules Modules run at once, each on a
+    Java thread; further Modules are queued, without blocking the caller.
+    To bound the memory held by queued Modules, their inputs can be supplied
+    by a function, which converts them into Java only once the Module is
+    dispatched - so at most settings.max_concurrent_modules sets of inputs
+    are converted at once.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._running = 0
+        self._queue: Deque[Tuple] = deque()
+
+    def max_concurrency(self) -> int:
+        return max(1, settings.max_concurrent_modules)
+
+    def submit(
+        self,
+        module: "jc.Module",
+        preprocessors: "jc.List",
+        postprocessors: "jc.List",
+        input_map: Union["jc.Map", Callable[[], "jc.Map"]],
+    ) -> Future:
+        """
+        Queues a Module to be run.
+
+        NB this call never blocks.
+
+        :param module: the Module to run
+        :param preprocessors: the preprocessors to run before the Module
+        :param postprocessors: the postprocessors to run after the Module
+        :param input_map: the inputs of the Module, or a function creating
+            them, called on a Java thread once the Module is dispatched
+        :return: a Future completed with the Module, once it has run
+        """
+        future = Future()
+        with self._lock:
+            self._queue.append(
+                (future, module, preprocessors, postprocessors, input_map)
+            )
+            self._dispatch()
+        return future
+
+    def pending(self) -> int:
+        """Returns the number of Modules queued or running."""
+        with self._lock:
+            return self._running + len(self._queue)
+
+    def _dispatch(self):
+        # NB the lock must be held
+        while self._queue and self._running < self.max_concurrency():
+            job = self._queue.popleft()
+            # Skip jobs canceled while queued
+            if not job[0].set_running_or_notify_cancel():
+                continue
+            self._running += 1
+            # NB the cast selects ThreadService.run(Runnable)
+            nij.ij.thread().run(jc.Runnable @ (lambda job=job: self._run(*job)))
+
+    def _run(self, future: Future, module, preprocessors, postprocessors, input_map):
+        try:
+            # NB the Module is run on this thread, rather than through the
+            # ModuleService, which would wait upon yet another Java thread
+            if callable(input_map):
+                input_map = input_map()
+            _assign_inputs(module, input_map)
+            jc.ModuleRunner(
+                nij.ij.context(), module, preprocessors, postprocessors
+            ).call()
+            future.set_result(module)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._dispatch()
+
+
+def _assign_inputs(module: "jc.Module", input_map: "jc.Map") -> None:
+    """
+    Assigns inputs to a Module, as ModuleService.run(...) does.
+    :param module: the Module
+    :param input_map: the inputs, keyed by name, converted to each input's type
+    """
+    for entry in input_map.entrySet():
+        name, value = entry.getKey(), entry.getValue()
+        item = module.getInfo().getInput(name)
+        if item is not None:
+            value = nij.ij.convert().convert(value, item.getType())
+        module.setInput(name, value)
+        module.resolveInput(name)
+
+
+module_executor = ModuleExecutor()
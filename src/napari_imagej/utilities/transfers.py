@@ -0,0 +1,215 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import current_thread, main_thread
+from typing import Any, Callable, Deque, Generator, List, Optional, Sequence, Tuple
+
+from napari.qt.threading import GeneratorWorker, create_worker
+from napari.utils import cancelable_progress
+from scyjava import jvm_started
+
+from napari_imagej.java import jc
+
+# The maximum number of conversions run at once by transfer_all
+MAX_CONCURRENT_CONVERSIONS = 4
+# The interval (in seconds) at which transfers yield while converting,
+# such that they can be canceled
+_POLL_INTERVAL = 0.1
+
+# A transfer yields the number of bytes moved as it progresses,
+# and returns the transferred data
+Transfer = Callable[[], Generator[int, None, Any]]
+
+
+def nbytes_of(data: Any) -> int:
+    """Estimates the number of bytes within data, or 0 if unknown."""
+    if isinstance(data, (list, tuple)) and data:
+        # NB multiscale data is transferred at its finest level
+        data = data[0]
+    return int(getattr(data, "nbytes", 0) or 0)
+
+
+class TransferQueue:
+    """Moves data between napari and ImageJ on a background worker.
+
+    Transfers run one at a time, in the order they were submitted; a transfer
+    submitted while another is in flight is queued. Each transfer is shown
+    with a napari progress bar, counting the bytes moved as each item is
+    converted, which can be used to cancel it. Once a transfer finishes, its
+    result is handed to a callback on the GUI thread.
+
+    submit(...) must be called from the GUI thread.
+    """
+
+    def __init__(self):
+        self._queue: Deque[Tuple[Transfer, Callable[[Any], None], str, int]] = deque()
+        self._worker: Optional[GeneratorWorker] = None
+
+    def submit(
+        self,
+        transfer: Transfer,
+        on_done: Callable[[Any], None],
+        desc: str,
+        nbytes: int = 0,
+    ) -> None:
+        """
+        Queues a transfer.
+        :param transfer: the transfer, run on a background worker
+        :param on_done: called with the result of transfer, on the GUI thread
+        :param desc: the description of the transfer's progress bar
+        :param nbytes: the number of bytes the transfer will move, if known
+        """
+        self._queue.append((transfer, on_done, desc, nbytes))
+        if self._worker is None:
+            self._start_next()
+
+    def busy(self) -> bool:
+        """Returns True iff a transfer is in flight."""
+        return self._worker is not None
+
+    def cancel(self) -> None:
+        """Cancels all queued transfers, and the transfer in flight."""
+        self._queue.clear()
+        if self._worker is not None:
+            self._worker.quit()
+
+    def _start_next(self):
+        self._worker = None
+        if not self._queue:
+            return
+        transfer, on_done, desc, nbytes = self._queue.popleft()
+        self._worker = create_worker(
+            _run_transfer,
+            transfer,
+            _connect={"returned": on_done, "finished": self._start_next},
+        )
+        pbar = _TransferProgress(total=nbytes, desc=desc)
+        pbar.cancel_callback = self._worker.quit
+        self._worker.yielded.connect(pbar.update)
+        self._worker.finished.connect(pbar.close)
+        self._worker.start()
+
+
+class _TransferProgress(cancelable_progress):
+    """
+    A progress bar counting the bytes moved by a transfer.
+
+    NB cancelable_progress only calls its cancel_callback while iterating,
+    which a transfer never does, so it is called upon cancellation instead.
+    """
+
+    def cancel(self) -> None:
+        super().cancel()
+        if self.cancel_callback is not None:
+            self.cancel_callback()
+
+
+def transfer_one(
+    convert: Callable[[Any], Any], item: Any, nbytes: int
+) -> Generator[int, None, Any]:
+    """
+    A transfer converting one item.
+
+    The conversion runs on its own thread, while the transfer yields (zero
+    bytes) regularly, such that it can be canceled at any time. A canceled
+    conversion finishes in the background, and its result is discarded.
+
+    NB a single conversion cannot report its own progress, so the bytes of
+    item are yielded all at once, when it is converted.
+
+    :param convert: the conversion to apply to item
+    :param item: the item to convert
+    :param nbytes: the number of bytes within item
+    :return: a generator yielding the bytes of item, once it is converted,
+        and returning the converted item
+    """
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = pool.submit(_detaching, convert, item)
+        while not wait([future], timeout=_POLL_INTERVAL).done:
+            yield 0
+        result = future.result()
+        yield nbytes
+        return result
+    finally:
+        pool.shutdown(wait=False)
+
+
+def transfer_all(
+    convert: Callable[[Any], Any],
+    items: Sequence[Any],
+    sizes: Sequence[int],
+) -> Generator[int, None, List[Any]]:
+    """
+    A transfer converting many items, overlapping their conversions.
+
+    At most MAX_CONCURRENT_CONVERSIONS items are converted at once. Like
+    transfer_one, the transfer yields (zero bytes) regularly while converting.
+    Closing the generator (i.e. canceling the transfer) cancels all
+    conversions that have not yet started, without waiting for the others.
+
+    :param convert: the conversion to apply to each item
+    :param items: the items to convert
+    :param sizes: the number of bytes within each item
+    :return: a generator yielding the bytes of each item, as it is converted,
+        and returning the converted items, in the order of items
+    """
+    results: List[Any] = [None] * len(items)
+    if not items:
+        return results
+    pool = ThreadPoolExecutor(max_workers=min(len(items), MAX_CONCURRENT_CONVERSIONS))
+    try:
+        futures = {
+            pool.submit(_detaching, convert, item): i for i, item in enumerate(items)
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(
+                pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                yield 0
+            for future in done:
+                i = futures[future]
+                results[i] = future.result()
+                yield sizes[i]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _detaching(func: Callable[[Any], Any], arg: Any) -> Any:
+    try:
+        return func(arg)
+    finally:
+        _detach()
+
+
+def _run_transfer(transfer: Transfer):
+    # NB a canceled transfer is never resumed by its worker; it is closed by
+    # the garbage collector, on any thread. So the worker thread is detached
+    # before each yield, while it is still the current thread.
+    moves = transfer()
+    try:
+        moved = next(moves)
+        while True:
+            _detach()
+            yield moved
+            moved = next(moves)
+    except StopIteration as e:
+        return e.value
+    finally:
+        moves.close()
+        _detach()
+
+
+def _detach():
+    # Detach JPype thread, as worker threads are pooled
+    # NB Java must NOT be touched on this thread after this call. See
+    # https://jpype.readthedocs.io/en/v1.5.0/userguide.html#python-threads
+    if current_thread() is main_thread():
+        return
+    if jvm_started() and jc.Thread.isAttached():
+        jc.Thread.detach()
+
+
+transfer_queue = TransferQueue()
@@ -2,8 +2,10 @@
 The top-level menu for the napari-imagej widget.
 """
 
+from collections import OrderedDict
+from logging import getLogger
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Iterable, List, Optional, Tuple
 
 from magicgui.widgets import request_values
 from napari import Viewer
@@ -15,9 +17,21 @@ from qtpy.QtWidgets import QHBoxLayout, QMessageBox, QPushButton, QWidget
 from scyjava import is_arraylike
 
 from napari_imagej import nij, settings
+from napari_imagej.java import jc
 from napari_imagej.resources import resource_path
-from napari_imagej.utilities.event_subscribers import UIShownListener
+from napari_imagej.utilities.conversion_cache import conversion_cache
+from napari_imagej.utilities.event_subscribers import (
+    ImageUpdatedListener,
+    UIShownListener,
+)
 from napari_imagej.utilities.events import subscribe, unsubscribe
+from napari_imagej.utilities.linked_layers import linked_layers
+from napari_imagej.utilities.transfers import (
+    nbytes_of,
+    transfer_all,
+    transfer_one,
+    transfer_queue,
+)
 from napari_imagej.widgets.repl import REPLWidget
 from napari_imagej.widgets.widget_utils import _IMAGE_LAYER_TYPES, DetailExportDialog
 
@@ -33,9 +47,15 @@ class NapariImageJMenu(QWidget):
         self.from_ij: FromIJButton = FromIJButton(viewer)
         self.layout().addWidget(self.from_ij)
 
+        self.from_ij_all: FromIJAllButton = FromIJAllButton(viewer)
+        self.layout().addWidget(self.from_ij_all)
+
         self.to_ij: ToIJButton = ToIJButton(viewer)
         self.layout().addWidget(self.to_ij)
 
+        self.to_ij_all: ToIJAllButton = ToIJAllButton(viewer)
+        self.layout().addWidget(self.to_ij_all)
+
         self.to_ij_detail: ToIJDetailedButton = ToIJDetailedButton(viewer)
         self.layout().addWidget(self.to_ij_detail)
 
@@ -48,6 +68,8 @@ class NapariImageJMenu(QWidget):
         self.settings_button: SettingsButton = SettingsButton(viewer)
         self.layout().addWidget(self.settings_button)
 
+        viewer.layers.events.removed.connect(self._layer_removed)
+
         if settings.headless():
             self.gui_button.clicked.connect(self.gui_button.disable_popup)
         else:
@@ -67,6 +89,12 @@ class NapariImageJMenu(QWidget):
 
             self.gui_button.clicked.connect(show_ui)
 
+    def _layer_removed(self, event):
+        # Removed layers no longer need to be linked with ImageJ, nor
+        # should their conversions be kept
+        linked_layers.unlink(event.value)
+        conversion_cache.invalidate(event.value)
+
     def finalize(self):
         # GUIButton initialization
         if not settings.headless():
@@ -156,12 +184,25 @@ class ToIJButton(IJMenuButton):
     def send_active_layer(self):
         layer: Optional[Layer] = self.viewer.layers.selection.active
         if layer:
-            # Queue UI call on the EDT
-            # TODO: Use EventQueue.invokeLater scyjava wrapper, once it exists
-            nij.ij.thread().queue(lambda: nij.ij.ui().show(nij.ij.py.to_java(layer)))
+            self._send_layer(layer)
         else:
             self.handle_no_choices()
 
+    def _send_layer(self, layer: Layer):
+        nbytes = nbytes_of(layer.data)
+        _link_layers([layer])
+
+        # Convert the layer on a background worker
+        def transfer():
+            return (yield from transfer_one(_layer_to_java, layer, nbytes))
+
+        def show(j_layer):
+            # Queue UI call on the EDT
+            # TODO: Use EventQueue.invokeLater scyjava wrapper, once it exists
+            nij.ij.thread().queue(lambda: nij.ij.ui().show(j_layer))
+
+        transfer_queue.submit(transfer, show, f"Sending {layer.name}", nbytes)
+
     def handle_no_choices(self):
         RichTextPopup(
             rich_message="There is no active window to export to ImageJ!",
@@ -173,6 +214,66 @@ class ToIJButton(IJMenuButton):
             self.setEnabled(isinstance(event.source.active, Image))
 
 
+class ToIJAllButton(IJMenuButton):
+    """
+    Button exporting all napari Image layers to ImageJ2 at once.
+    All layers are converted within one transfer, and then shown in ImageJ2
+    within one call on the EDT.
+    """
+
+    def __init__(self, viewer: Viewer):
+        super().__init__(viewer)
+        self.layers_changed()
+        viewer.layers.events.inserted.connect(self.layers_changed)
+        viewer.layers.events.removed.connect(self.layers_changed)
+
+        self.setToolTip("Export all napari Image Layers")
+        self.clicked.connect(self.send_all_layers)
+
+    def _icon(self):
+        return QColoredSVGIcon(resource_path("export_all"))
+
+    def _layers(self) -> List[Image]:
+        return [layer for layer in self.viewer.layers if isinstance(layer, Image)]
+
+    def send_all_layers(self):
+        layers = self._layers()
+        if not layers:
+            self.handle_no_choices()
+            return
+        sizes = [nbytes_of(layer.data) for layer in layers]
+        _link_layers(layers)
+
+        # Convert the layers on a background worker
+        def transfer():
+            return (yield from transfer_all(_layer_to_java, layers, sizes))
+
+        def show(j_layers):
+            def show_all():
+                # NB ImageJ2 has no API creating many displays within one
+                # DisplayService update; each display is created, and shown,
+                # by its own ui().show(...) call
+                for j_layer in j_layers:
+                    nij.ij.ui().show(j_layer)
+
+            # Queue one UI call on the EDT for all layers
+            # TODO: Use EventQueue.invokeLater scyjava wrapper, once it exists
+            nij.ij.thread().queue(show_all)
+
+        transfer_queue.submit(
+            transfer, show, f"Sending {len(layers)} layers", sum(sizes)
+        )
+
+    def handle_no_choices(self):
+        RichTextPopup(
+            rich_message="There are no Image layers to export to ImageJ!",
+            exec=True,
+        )
+
+    def layers_changed(self, event=None):
+        self.setEnabled(bool(self._layers()))
+
+
 class FromIJButton(IJMenuButton):
     def __init__(self, viewer: Viewer):
         super().__init__(viewer)
@@ -189,13 +290,11 @@ class FromIJButton(IJMenuButton):
         return list(compatibleInputs)
 
     def get_active_layer(self) -> None:
-        # HACK: Sync ImagePlus before transferring
-        # This code can be removed once
-        # https://github.com/imagej/imagej-legacy/issues/286 is solved.
+        # Sync ImagePlus before transferring
         if nij.ij.legacy and nij.ij.legacy.isActive():
             current_image_plus = nij.ij.WindowManager.getCurrentImage()
             if current_image_plus is not None:
-                nij.ij.py.sync_image(current_image_plus)
+                _sync_image(current_image_plus)
         # Get the active view from the active image display
         ids = nij.ij.get("net.imagej.display.ImageDisplayService")
         # TODO: simplify to no-args once
@@ -207,34 +306,26 @@ class FromIJButton(IJMenuButton):
             self.handle_no_choices()
 
     def _add_layer(self, view):
-        # Convert the object into Python
-        py_image = nij.ij.py.from_java(view)
-
-        def add_layer(layer: Layer) -> None:
-            self.viewer.add_layer(layer)
-            # Check the metadata for additonal layers, like
-            # Shapes/Tracks/Points
-            for _, v in layer.metadata.items():
-                if isinstance(v, Layer):
-                    self.viewer.add_layer(v)
-                elif isinstance(v, Iterable):
-                    for itm in v:
-                        if isinstance(itm, Layer):
-                            self.viewer.add_layer(itm)
-
-        # Create and add the layer
-        if isinstance(py_image, Layer):
-            add_layer(py_image)
-        elif isinstance(py_image, (Tuple, List)):
-            for image in py_image:
-                if isinstance(image, Layer):
-                    add_layer(image)
-        # Other
-        elif is_arraylike(py_image):
-            name = nij.ij.object().getName(view)
-            self.viewer.add_image(data=py_image, name=name)
-        else:
-            raise ValueError(f"{view} cannot be displayed in napari!")
+        # Linked layers already show the data of their Dataset
+        if (layer := _linked_layer(self.viewer, view)) is not None:
+            layer.refresh()
+            self.viewer.layers.selection.active = layer
+            return
+        name, nbytes = _describe_view(view)
+
+        # Convert the object into Python, on a background worker
+        def transfer():
+            return (yield from transfer_one(nij.ij.py.from_java, view, nbytes))
+
+        transfer_queue.submit(
+            transfer,
+            lambda py_image: self._add_converted(view, py_image, name),
+            f"Importing {name}",
+            nbytes,
+        )
+
+    def _add_converted(self, view, py_image, name: str):
+        _add_to_viewer(self.viewer, view, py_image, name)
 
     def handle_no_choices(self):
         RichTextPopup(
@@ -243,6 +334,175 @@ class FromIJButton(IJMenuButton):
         )
 
 
+class FromIJAllButton(IJMenuButton):
+    """
+    Button importing all open ImageJ2 images into napari at once.
+    All images are converted within one transfer, and then added to napari
+    within one call on the GUI thread.
+    """
+
+    def __init__(self, viewer: Viewer):
+        super().__init__(viewer)
+
+        self.setToolTip("Import all open ImageJ2 Datasets")
+        self.clicked.connect(self.get_all_layers)
+
+    def _icon(self):
+        return QColoredSVGIcon(resource_path("import_all"))
+
+    def get_all_layers(self) -> None:
+        # Sync ImagePlus before transferring
+        if nij.ij.legacy and nij.ij.legacy.isActive():
+            for image_id in nij.ij.WindowManager.getIDList() or []:
+                image_plus = nij.ij.WindowManager.getImage(image_id)
+                if image_plus is not None:
+                    _sync_image(image_plus)
+        # Get the active view from each image display
+        ids = nij.ij.get("net.imagej.display.ImageDisplayService")
+        views = [ids.getActiveDatasetView(d) for d in ids.getImageDisplays()]
+        views = [v for v in views if v is not None]
+        # Linked layers already show the data of their Dataset
+        views = [v for v in views if _linked_layer(self.viewer, v) is None]
+        if views:
+            self._add_layers(views)
+        else:
+            self.handle_no_choices()
+
+    def _add_layers(self, views):
+        names, sizes = zip(*(_describe_view(v) for v in views))
+
+        # Convert the objects into Python, on a background worker
+        def transfer():
+            return (yield from transfer_all(nij.ij.py.from_java, views, sizes))
+
+        def add_all(py_images):
+            for view, py_image, name in zip(views, py_images, names):
+                _add_to_viewer(self.viewer, view, py_image, name)
+
+        transfer_queue.submit(
+            transfer, add_all, f"Importing {len(views)} images", sum(sizes)
+        )
+
+    def handle_no_choices(self):
+        RichTextPopup(
+            rich_message="There are no open images to import into napari!",
+            exec=True,
+        )
+
+
+# The version of each ImagePlus when it was last synced, keyed by ImagePlus ID
+_SYNCED_VERSIONS_SIZE = 64
+_synced_versions: OrderedDict = OrderedDict()
+# Counts the updates of each ImagePlus, once listening
+_image_updates: Optional[ImageUpdatedListener] = None
+
+
+def _sync_image(imp: "jc.ImagePlus") -> None:
+    """
+    Syncs the ImagePlus with its ImageJ2 Dataset, unless the ImagePlus is
+    unchanged since it was last synced.
+
+    HACK: This code can be removed once
+    https://github.com/imagej/imagej-legacy/issues/286 is solved.
+    """
+    global _image_updates
+    if _image_updates is None:
+        _image_updates = ImageUpdatedListener()
+        jc.ImagePlus.addImageListener(_image_updates)
+    # NB sync_image copies the current slice from the ImageProcessor.
+    # ImageJ updates a displayed ImagePlus (i.e. calls updateAndDraw) after
+    # changing its pixels, so the slice is versioned by that update count,
+    # along with its unsaved changes flag, and the identity of its processor
+    # and pixel array. ImagePlus updates are only announced for displayed
+    # images, so hidden (e.g. batch mode) images are always synced.
+    key = int(imp.getID())
+    if imp.getWindow() is None:
+        _synced_versions.pop(key, None)
+        nij.ij.py.sync_image(imp)
+        return
+    processor = imp.getProcessor()
+    version = (
+        int(imp.getCurrentSlice()),
+        int(jc.System.identityHashCode(processor)),
+        int(jc.System.identityHashCode(processor.getPixels())),
+        bool(imp.changes),
+        _image_updates.updates.get(key, 0),
+    )
+    if _synced_versions.get(key) == version:
+        _synced_versions.move_to_end(key)
+        return
+    nij.ij.py.sync_image(imp)
+    _synced_versions[key] = version
+    if len(_synced_versions) > _SYNCED_VERSIONS_SIZE:
+        _synced_versions.popitem(last=False)
+
+
+def _link_layers(layers: List[Layer]) -> None:
+    """
+    Links napari layers with ImageJ, if requested.
+    NB linking wraps, rather than copies, the data, so it is done on the GUI
+    thread, before any transfer.
+    """
+    if not settings.link_exported_layers:
+        return
+    for layer in layers:
+        if isinstance(layer, Image):
+            try:
+                linked_layers.link(layer)
+            except ValueError as e:
+                getLogger("napari-imagej").debug(f"{e}; copying it instead")
+
+
+def _layer_to_java(layer: Layer) -> Any:
+    """Converts a napari layer into Java, reusing its linked Dataset, if any."""
+    if isinstance(layer, Image) and (dataset := linked_layers.dataset(layer)):
+        return dataset
+    return nij.ij.py.to_java(layer)
+
+
+def _linked_layer(viewer: Viewer, view) -> Optional[Image]:
+    """Finds the layer within viewer linked with the data of view, if any."""
+    data = view.getData()
+    layer = linked_layers.layer(data) if data is not None else None
+    return layer if layer is not None and layer in viewer.layers else None
+
+
+def _describe_view(view) -> Tuple[str, int]:
+    """Returns the name of view, and the number of bytes within its data."""
+    name = str(nij.ij.object().getName(view))
+    data = view.getData()
+    return name, int(data.getBytesOfInfo()) if data is not None else 0
+
+
+def _add_to_viewer(viewer: Viewer, view, py_image, name: str):
+    """Adds py_image, converted from view, to the viewer."""
+
+    def add_layer(layer: Layer) -> None:
+        viewer.add_layer(layer)
+        # Check the metadata for additonal layers, like
+        # Shapes/Tracks/Points
+        for _, v in layer.metadata.items():
+            if isinstance(v, Layer):
+                viewer.add_layer(v)
+            elif isinstance(v, Iterable):
+                for itm in v:
+                    if isinstance(itm, Layer):
+                        viewer.add_layer(itm)
+
+    # Create and add the layer
+    if isinstance(py_image, Layer):
+        add_layer(py_image)
+    elif isinstance(py_image, (Tuple, List)):
+        for image in py_image:
+            if isinstance(image, Layer):
+                add_layer(image)
+    # Other
+    elif is_arraylike(py_image):
+        viewer.add_image(data=py_image, name=name)
+    else:
+        raise ValueError(f"{view} cannot be displayed in napari!")
+
+
 class GUIButton(IJMenuButton):
     _icon_path = resource_path("imagej2-16x16-flat-disabled")
 
@@ -342,6 +602,25 @@ class SettingsButton(IJMenuButton):
         args["jvm_command_line_arguments"]["options"] = {
             "label": "JVM command line arguments",
         }
+        args["lazy_image_conversion"]["options"] = {
+            "label": "load ImageJ images lazily",
+        }
+        args["multiscale_image_conversion"]["options"] = {
+            "label": "load large ImageJ images as pyramids",
+        }
+        args["link_exported_layers"]["options"] = {
+            "label": "link exported layers with ImageJ",
+        }
+        args["trackmate_tracks_only"]["options"] = {
+            "label": "import only tracks from TrackMate XML",
+        }
+        args["cache_type_information"]["options"] = {
+            "label": "cache ImageJ type information on disk",
+        }
+        args["max_concurrent_modules"]["options"] = {
+            "label": "maximum concurrent ImageJ commands",
+            "min": 1,
+        }
 
         # Use magicgui.request_values to allow user to configure settings
         choices = request_values(title="napari-imagej settings", values=args)
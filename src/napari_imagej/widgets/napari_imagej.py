@@ -20,6 +20,7 @@ from scyjava import jstacktrace, when_jvm_stops, jvm_started
 
 from napari_imagej import nij
 from napari_imagej.java import jc
+from napari_imagej.types.type_conversions import build_support_index
 from napari_imagej.utilities._module_utils import _non_layer_widget
 from napari_imagej.utilities.event_subscribers import (
     NapariEventSubscriber,
@@ -248,6 +249,8 @@ class ImageJInitializer(QThread):
             self._finalize_info_bar()
             # Finalize EventSubscribers
             self._finalize_subscribers()
+            # Index type conversions in the background
+            self._finalize_support_index()
             # jc.Thread.detach()
         except Exception as e:
             # Handle the exception on the GUI thread
@@ -304,6 +307,10 @@ class ImageJInitializer(QThread):
         self.event_listener = NapariEventSubscriber()
         subscribe(nij.ij, self.event_listener)
 
+    def _finalize_support_index(self):
+        # NB the cast selects ThreadService.run(Runnable)
+        nij.ij.thread().run(jc.Runnable @ build_support_index)
+
     def _clean_subscribers(self):
         # Unsubscribe listeners
         if hasattr(self, "progress_listener"):
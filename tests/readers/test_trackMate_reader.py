@@ -0,0 +1,90 @@
+"""
+A module testing napari_imagej.readers.trackMate_reader
+"""
+
+import numpy as np
+import pytest
+
+from napari_imagej.readers.trackMate_reader import (
+    _is_trackmate_xml,
+    tracks_reader_function,
+)
+
+TRACKMATE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<TrackMate version="7.11.1">
+  <Model spatialunits="pixel" timeunits="frame">
+    <AllSpots nspots="7">
+      <SpotsInFrame frame="0">
+        <Spot ID="1" FRAME="0" POSITION_X="0.0" POSITION_Y="0.0" POSITION_Z="0.0" />
+        <Spot ID="9" FRAME="0" POSITION_X="8.0" POSITION_Y="8.0" POSITION_Z="0.0" />
+      </SpotsInFrame>
+      <SpotsInFrame frame="1">
+        <Spot ID="2" FRAME="1" POSITION_X="2.0" POSITION_Y="0.0" POSITION_Z="0.0" />
+        <Spot ID="8" FRAME="1" POSITION_X="9.0" POSITION_Y="8.0" POSITION_Z="0.0" />
+      </SpotsInFrame>
+      <SpotsInFrame frame="2">
+        <Spot ID="3" FRAME="2" POSITION_X="4.0" POSITION_Y="-2.0" POSITION_Z="0.0" />
+        <Spot ID="4" FRAME="2" POSITION_X="4.0" POSITION_Y="2.0" POSITION_Z="0.0" />
+        <Spot ID="5" FRAME="2" POSITION_X="6.0" POSITION_Y="6.0" POSITION_Z="0.0" />
+      </SpotsInFrame>
+    </AllSpots>
+    <AllTracks>
+      <Track name="Track_0" TRACK_ID="0">
+        <Edge SPOT_SOURCE_ID="1" SPOT_TARGET_ID="2" />
+        <Edge SPOT_SOURCE_ID="2" SPOT_TARGET_ID="3" />
+        <Edge SPOT_SOURCE_ID="4" SPOT_TARGET_ID="2" />
+      </Track>
+      <Track name="Track_1" TRACK_ID="1">
+        <Edge SPOT_SOURCE_ID="9" SPOT_TARGET_ID="8" />
+      </Track>
+    </AllTracks>
+    <FilteredTracks>
+      <TrackID TRACK_ID="0" />
+    </FilteredTracks>
+  </Model>
+  <Settings>
+    <ImageData filename="cells.tif" nslices="1" pixelwidth="2.0"
+      pixelheight="2.0" voxeldepth="1.0" />
+  </Settings>
+</TrackMate>
+"""
+
+
+@pytest.fixture
+def trackmate_xml(tmp_path):
+    path = tmp_path / "tracks.xml"
+    path.write_text(TRACKMATE_XML)
+    return str(path)
+
+
+def test_is_trackmate_xml(tmp_path, trackmate_xml):
+    assert _is_trackmate_xml(trackmate_xml)
+    other = tmp_path / "other.xml"
+    other.write_text("<Other><TrackMate /></Other>")
+    assert not _is_trackmate_xml(str(other))
+    invalid = tmp_path / "invalid.xml"
+    invalid.write_text("not xml")
+    assert not _is_trackmate_xml(str(invalid))
+
+
+def test_tracks_reader_function(trackmate_xml):
+    layers = tracks_reader_function(trackmate_xml)
+    assert len(layers) == 1
+    data, kwargs, layer_type = layers[0]
+    assert layer_type == "tracks"
+    assert kwargs["name"] == "cells.tif-tracks"
+    # Spots 3, 4 and 5 split from spot 2 - only the visible track is read
+    # NB positions are divided by the calibration
+    rows = sorted(map(tuple, data[:, 1:]))
+    assert rows == [
+        (0.0, 0.0, 0.0),
+        (1.0, 0.0, 1.0),
+        (2.0, -1.0, 2.0),
+        (2.0, 1.0, 2.0),
+    ]
+    # The first two spots form one branch, and the others branch from it
+    branch = {row[1]: row[0] for row in data if row[1] < 2}
+    assert branch[0.0] == branch[1.0]
+    assert kwargs["graph"][branch[0.0]] == []
+    assert sum(parents == [branch[0.0]] for parents in kwargs["graph"].values()) == 2
+    assert np.unique(data[:, 0]).size == 3
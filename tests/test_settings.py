@@ -2,6 +2,8 @@
 A module testing napari-imagej settings
 """
 
+import os
+
 from scyjava import jimport
 
 from napari_imagej import settings
@@ -74,6 +76,33 @@ def test_validate_default_settings_macos():
     assert errors[0].startswith("The ImageJ GUI is not available on macOS systems.")
 
 
+def test_validate_max_concurrent_modules():
+    """
+    Assert that a non-positive max_concurrent_modules is noticed by validate.
+    """
+    settings._is_macos = False
+    settings.max_concurrent_modules = 0
+
+    errors = validation_errors()
+    assert len(errors) == 1
+    assert errors[0].startswith("At least one ImageJ command must be able to run")
+
+
+def test_installation_key(monkeypatch, tmp_path):
+    """
+    Assert that the installation key changes whenever the installation does.
+    """
+    monkeypatch.setattr(settings, "imagej_directory_or_endpoint", str(tmp_path))
+    key = settings.installation_key("2.15.0")
+    assert key == settings.installation_key("2.15.0")
+    assert key != settings.installation_key("2.16.0")
+    # Assert the jars directory is considered
+    jars = tmp_path / "jars"
+    jars.mkdir()
+    os.utime(jars, (0, 0))
+    assert settings.installation_key("2.15.0") != key
+
+
 def validation_errors():
     try:
         settings.validate()
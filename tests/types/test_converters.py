@@ -2,15 +2,29 @@
 A module testing napari_imagej.types.converters
 """
 
+import gc
+import weakref
 from typing import Any, Dict, List
 
 import numpy as np
 import pytest
-from jpype import JArray, JDouble
+from jpype import JArray, JByte, JDouble
+from dask.array import Array
 from labeling.Labeling import Labeling
 from napari.layers import Image, Labels, Points, Shapes, Surface
-
+from scyjava import jimport
+
+from napari_imagej import settings
+from napari_imagej.types.converters.images import (
+    _color_table_to_colormap,
+    _colormap_to_color_table,
+    _java_image_to_lazy_xarray,
+    _java_image_to_pyramid,
+    _layer_data,
+    _shareable_data,
+)
 from napari_imagej.types.converters.labels import _labeling_to_layer, _layer_to_labeling
+from napari_imagej.types.converters.meshes import NORMALS_KEY, TEXTURES_KEY
 from napari_imagej.types.enum_likes import OutOfBoundsFactory
 from napari_imagej.types.enums import _ENUMS, py_enum_for
 from napari_imagej.types.type_conversions import type_hint_for
@@ -551,6 +565,30 @@ def test_multiple_layer_to_masks(ij, multiple_layer):
     assert rois[1].sideLength(1) == 20
 
 
+def test_interleaved_layer_to_masks(ij):
+    # Interleave shape types, which are converted in batches
+    shp = Shapes()
+    for i in range(3):
+        shp.add_polygons(np.array([[0, 0], [0, 5 + i], [5 + i, 0]]))
+        shp.add_paths(np.array([[0, 0], [i, 1], [2, i]]))
+        shp.add_lines(np.array([[0, 0], [i, 1]]))
+    rois = [child.data() for child in ij.py.to_java(shp).children()]
+    # The order of the shapes should be preserved
+    assert len(rois) == 9
+    for i in range(3):
+        assert isinstance(rois[3 * i], jc.Polygon2D)
+        assert rois[3 * i].vertices().get(1).getDoublePosition(0) == 5 + i
+        assert isinstance(rois[3 * i + 1], jc.Polyline)
+        assert rois[3 * i + 1].vertices().get(2).getDoublePosition(0) == i
+        assert isinstance(rois[3 * i + 2], jc.Line)
+        assert rois[3 * i + 2].endpointTwo().getDoublePosition(1) == i
+    # The round trip should be lossless
+    round_trip = ij.py.from_java(ij.py.to_java(shp))
+    assert round_trip.shape_type == shp.shape_type
+    for expected, actual in zip(shp.data, round_trip.data):
+        assert np.array_equal(expected, actual)
+
+
 # -- Points / RealPointCollections -- #
 
 
@@ -604,6 +642,17 @@ def test_points_to_realpointcollection(ij, points):
         assert e == a
 
 
+def test_nd_points_circular(ij):
+    data = np.arange(40, dtype=np.float64).reshape((10, 4))
+    collection = ij.py.to_java(Points(data=data))
+    assert collection.numDimensions() == 4
+    # NB dimensions are reversed across language barrier
+    first = JArray(JDouble)(4)
+    next(iter(collection.points())).localize(first)
+    assert list(first) == [3, 2, 1, 0]
+    assert np.array_equal(ij.py.from_java(collection).data, data)
+
+
 # -- Surfaces/Meshes -- #
 
 
@@ -656,6 +705,30 @@ def test_mesh_to_surface(ij, mesh: "jc.Mesh"):
         assert p_triangle[2] == j_triangle.vertex2()
 
 
+def test_surface_mesh_normals_and_textures(ij):
+    # NB 0.1 is not exactly representable in single precision
+    vertices = np.array([0, 0, 0, 0, 10, 0, 0, 0, 10.1]).reshape((3, 3))
+    triangles = np.array([[0, 1, 2]])
+    textures = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+    surface = Surface(
+        data=(vertices, triangles, np.array([1.0, 2.0, 3.0])),
+        metadata={TEXTURES_KEY: textures},
+    )
+    mesh = ij.py.to_java(surface)
+    assert isinstance(mesh, jc.NaiveDoubleMesh)
+    # The triangle lies in the (Java) XY plane
+    for i in range(3):
+        assert abs(mesh.vertices().nz(i)) == 1
+    assert abs(mesh.triangles().nz(0)) == 1
+    # Vertices (in double precision), normals and textures survive the round trip
+    surface = ij.py.from_java(mesh)
+    assert np.array_equal(surface.vertices, vertices)
+    assert np.array_equal(surface.metadata[TEXTURES_KEY], textures)
+    assert np.array_equal(surface.data[2], [1.0, 2.0, 3.0])
+    normals = surface.metadata[NORMALS_KEY]
+    assert np.array_equal(np.abs(normals), [[1, 0, 0]] * 3)
+
+
 def test_surface_wrong_dimensions(ij, surface: Surface):
     # Test 2D data
     py_vertices, py_triangles, _ = surface.data
@@ -804,6 +877,46 @@ def test_image_layer_to_dataset(ij):
     assert j_img.getProperties().get("foo") == 4
 
 
+def test_image_layer_to_dataset_shares_buffer(ij):
+    """Test that the Dataset wraps the Image layer's data in place"""
+    data = np.zeros((10, 10))
+    j_img = ij.py.to_java(Image(data=data))
+    # Modifications in napari should be visible in ImageJ
+    data[0, 0] = 5
+    assert j_img.cursor().next().getRealDouble() == 5
+
+
+def test_shareable_data():
+    # Contiguous data should be shared
+    data = np.ones((10, 10))
+    shared, transfer = _shareable_data(data)
+    assert transfer == "shared"
+    assert shared is data
+    # Positively-strided data should be shared
+    strided = data[::2, ::2]
+    shared, transfer = _shareable_data(strided)
+    assert transfer == "shared"
+    assert shared is strided
+    # Complex data should be shared
+    for t in ["complex64", "complex128"]:
+        complex_data = np.ones((10, 10), dtype=t)
+        shared, transfer = _shareable_data(complex_data)
+        assert transfer == "shared"
+        assert shared is complex_data
+    # Negatively-strided data must be copied
+    flipped = np.arange(10)[::-1]
+    copied, transfer = _shareable_data(flipped)
+    assert transfer == "copy"
+    assert copied.flags["C_CONTIGUOUS"]
+    assert np.array_equal(copied, flipped)
+    # Byte-swapped data must be copied
+    swapped = data.astype(data.dtype.newbyteorder("S"))
+    copied, transfer = _shareable_data(swapped)
+    assert transfer == "copy"
+    assert copied.dtype.isnative
+    assert np.array_equal(copied, data)
+
+
 def test_binary_image_layer_to_dataset(ij):
     """Test conversion of an Image layer of booleans with a default colormap"""
     name = "test_foo"
@@ -838,6 +951,75 @@ def test_dataset_to_image_layer(ij, test_dataset):
     assert p_img.metadata.get("foo", None) == 4
 
 
+def test_dataset_to_lazy_image_layer(ij, test_dataset):
+    """Test lazy conversion of a Dataset with no colormap"""
+    settings.lazy_image_conversion = True
+    try:
+        p_img = ij.py.from_java(test_dataset)
+    finally:
+        settings.lazy_image_conversion = settings.defaults["lazy_image_conversion"]
+    assert isinstance(p_img, Image)
+    assert isinstance(p_img.data.data, Array)
+    assert test_dataset.getName() == p_img.name
+    assert p_img.metadata.get("foo", None) == 4
+    assert np.array_equal(np.asarray(p_img.data), np.ones((10, 10)))
+
+
+def test_cell_img_to_lazy_xarray(ij):
+    """Test that lazy xarrays are chunked along the cells of a CellImg"""
+    CellImgFactory = jimport("net.imglib2.img.cell.CellImgFactory")
+    UnsignedByteType = jimport("net.imglib2.type.numeric.integer.UnsignedByteType")
+    img = CellImgFactory(UnsignedByteType(), 4).create(10, 6, 3)
+    ra = img.randomAccess()
+    for d, p in enumerate([9, 5, 2]):
+        ra.setPosition(p, d)
+    ra.get().set(7)
+    dataset = ij.dataset().create(img)
+    dataset.setAxis(jc.DefaultLinearAxis(jc.Axes.Z, 1, 0), 2)
+
+    xarr = _java_image_to_lazy_xarray(dataset)
+    assert xarr.dims == ("pln", "row", "col")
+    assert xarr.data.chunks == ((3,), (4, 2), (4, 4, 2))
+    assert xarr[2, 5, 9] == 7
+    assert xarr.sum() == 7
+
+
+def test_dataset_to_multiscale_image_layer(ij):
+    """Test multiscale conversion of a large Dataset"""
+    data = np.arange(2048 * 1024, dtype=np.uint16).reshape((1024, 2048))
+    dataset = ij.dataset().create(ij.py.to_java(data))
+    settings.multiscale_image_conversion = True
+    try:
+        p_img = ij.py.from_java(dataset)
+    finally:
+        settings.multiscale_image_conversion = settings.defaults[
+            "multiscale_image_conversion"
+        ]
+    assert isinstance(p_img, Image)
+    assert p_img.multiscale
+    assert [level.shape for level in p_img.data] == [
+        (1024, 2048),
+        (512, 1024),
+        (256, 512),
+    ]
+    assert np.array_equal(np.asarray(p_img.data[2]), data[::4, ::4])
+    # Pyramids should be reused, while their levels are in use
+    levels = _java_image_to_pyramid(dataset)
+    assert all(a is b for a, b in zip(levels, _java_image_to_pyramid(dataset)))
+    # ...including while only views of them (e.g. channels) are in use
+    other = ij.dataset().create(ij.py.to_java(data))
+    levels = _java_image_to_pyramid(other)
+    level_refs = [weakref.ref(level) for level in levels]
+    views = _layer_data(levels, col=0)
+    del levels
+    gc.collect()
+    assert all(a is b() for a, b in zip(_java_image_to_pyramid(other), level_refs))
+    # ...but the cache should not keep them alive
+    del views
+    gc.collect()
+    assert all(level_ref() is None for level_ref in level_refs)
+
+
 def test_binary_dataset_to_image_layer(ij, test_binary_dataset):
     """Test conversion of a binary Dataset with no colormap"""
     p_img = ij.py.from_java(test_binary_dataset)
@@ -858,6 +1040,21 @@ def test_colormap_dataset_to_image_layer(ij, test_dataset):
     _assert_equal_color_maps(test_dataset.getColorTable(0), p_img.colormap)
 
 
+def test_color_table_conversion_cache(ij):
+    """Test that equal LUTs are converted once, in both directions"""
+    values = JArray(JArray(JByte))(3)
+    for i in range(3):
+        values[i] = JArray(JByte)([b if b < 128 else b - 256 for b in range(256)])
+    ctable = jc.ColorTable8(values)
+    cmap = _color_table_to_colormap(ctable)
+    _assert_equal_color_maps(ctable, cmap)
+    assert cmap is _color_table_to_colormap(jc.ColorTable8(values))
+
+    j_table = _colormap_to_color_table(cmap)
+    _assert_equal_color_maps(j_table, cmap)
+    assert j_table is _colormap_to_color_table(cmap)
+
+
 def test_multichannel_dataset_to_image_layers(ij, test_multichannel_dataset):
     test_multichannel_dataset.initializeColorTables(2)
     test_multichannel_dataset.setColorTable(jc.ColorTables.CYAN, 0)
@@ -870,6 +1067,14 @@ def test_multichannel_dataset_to_image_layers(ij, test_multichannel_dataset):
     assert "magenta" == p_imgs[1].colormap.name
 
 
+def test_multichannel_image_layers_share_data(ij, test_multichannel_dataset):
+    """Test that channel layers are views into one shared buffer"""
+    p_imgs = ij.py.from_java(test_multichannel_dataset)
+    assert len(p_imgs) == 2
+    assert np.shares_memory(p_imgs[0].data.data, p_imgs[1].data.data)
+    assert p_imgs[0].metadata == p_imgs[1].metadata
+
+
 def test_dataset_rgb_to_image_layer(ij, test_rgb_dataset):
     """Test conversion of a Dataset with no colormap"""
     p_img = ij.py.from_java(test_rgb_dataset)
@@ -893,3 +1098,82 @@ def test_colormap_dataset_view_to_image_layer(ij, test_dataset_view):
     assert test_dataset_view.getData().getName() == p_img.name
     assert "cyan" == p_img.colormap.name
     _assert_equal_color_maps(test_dataset_view.getColorTables().get(0), p_img.colormap)
+
+
+def test_predicate_profiling(ij):
+    from napari_imagej.types import converters
+
+    converters.PREDICATE_PROFILE.clear()
+    converters.profile_predicates()
+    try:
+        ij.py.from_java(jc.DefaultROITree())
+    finally:
+        converters.profile_predicates(False)
+    profile = converters.predicate_profile()
+    # Assert some predicates were profiled, ordered by time spent
+    assert profile
+    assert all(calls > 0 for _, calls, _ in profile)
+    assert [secs for _, _, secs in profile] == sorted(
+        (secs for _, _, secs in profile), reverse=True
+    )
+
+
+def test_converter_index():
+    from scyjava import Converter
+
+    from napari_imagej.types.converters import (
+        INSTANCE_CONVERTERS,
+        _ConverterIndex,
+        _indexed_converters,
+    )
+
+    calls = []
+
+    def is_int(obj):
+        calls.append(obj)
+        return isinstance(obj, int)
+
+    positive = Converter(
+        predicate=lambda obj: obj > 0, converter=lambda obj: "positive", priority=1
+    )
+    integer = Converter(predicate=is_int, converter=lambda obj: "int", priority=1)
+    INSTANCE_CONVERTERS.add(positive)
+    try:
+        index = _ConverterIndex([positive, integer]).as_converter()
+        assert index.priority == 1
+        # Per-instance predicates are checked for every object...
+        assert index.convert(1) == "positive"
+        assert index.convert(-1) == "int"
+        assert index.convert(-2) == "int"
+        # ...while per-class predicates are checked once per class
+        assert calls == [1]
+        assert not index.supports(-1.0)
+        assert not index.supports(-2.0)
+        assert calls == [1, -1.0]
+    finally:
+        INSTANCE_CONVERTERS.discard(positive)
+
+    # Assert Converters are indexed per priority level, keeping their priority
+    high = Converter(predicate=is_int, converter=lambda obj: "high", priority=2)
+    indexed = _indexed_converters([positive, integer, high])
+    assert sorted(c.priority for c in indexed) == [1, 2]
+
+
+def test_converter_index_weak_last():
+    from scyjava import Converter
+
+    from napari_imagej.types.converters import _ConverterIndex
+
+    class Obj:
+        pass
+
+    index = _ConverterIndex(
+        [Converter(predicate=lambda obj: True, converter=lambda obj: obj)]
+    )
+    # Assert a checked, but unconverted, object is not kept alive
+    obj = Obj()
+    assert index.supports(obj)
+    obj_ref = weakref.ref(obj)
+    del obj
+    gc.collect()
+    assert obj_ref() is None
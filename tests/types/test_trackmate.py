@@ -4,13 +4,21 @@ A module testing napari_imagej.types.converters.trackmate
 
 from typing import Tuple
 
+import dask.array as da
 import numpy as np
 import pytest
 from napari.layers import Labels, Tracks
+from jpype import JArray, JDouble
 from scyjava import JavaClasses
 
 from napari_imagej import settings
-from napari_imagej.types.converters.trackmate import TrackMateClasses, trackmate_present
+from napari_imagej.types.converters.trackmate import (
+    TrackMateClasses,
+    _lazy_label_image,
+    _verdict_cache,
+    track_overlay_predicate,
+    trackmate_present,
+)
 
 
 class TestTrackMateClasses(TrackMateClasses):
@@ -26,6 +34,10 @@ class TestTrackMateClasses(TrackMateClasses):
     def SelectionModel(self):
         return "fiji.plugin.trackmate.SelectionModel"
 
+    @JavaClasses.java_import
+    def SpotRoi(self):
+        return "fiji.plugin.trackmate.SpotRoi"
+
 
 jc = TestTrackMateClasses()
 
@@ -112,6 +124,10 @@ def test_Model_to_Tracks(asserter, ij, trackMate_example):
     tracks, labels = layers
     assert isinstance(tracks, Tracks)
     assert isinstance(labels, Labels)
+    # Assert the label image is rendered lazily, per timepoint
+    assert isinstance(labels.data, da.Array)
+    assert labels.data.shape == (1, 10, 10)
+    assert np.asarray(labels.data[0])[0, 0] > 0
     # Assert there are 5 branches
     assert len(tracks.graph) == 5
     # Assert that tracks 1 and 2 split from track 0
@@ -139,3 +155,63 @@ def test_Model_to_Tracks(asserter, ij, trackMate_example):
     results = ij.WindowManager.getCurrentImage()
     results.changes = False
     results.close()
+
+
+def test_label_image_spot_contours(ij):
+    if not (TESTING_LEGACY and trackmate_present()):
+        pytest.skip("TrackMate functionality requires ImageJ and TrackMate!")
+    model = jc.Model()
+    # A spot with a square contour, much larger than its radius
+    contour = jc.Spot(10.0, 10.0, 0.0, 1.0, -1.0, "contour")
+    contour.setRoi(
+        jc.SpotRoi(
+            JArray(JDouble)([-3.5, 3.5, 3.5, -3.5]),
+            JArray(JDouble)([-3.5, -3.5, 3.5, 3.5]),
+        )
+    )
+    # A spot without a contour
+    ellipse = jc.Spot(3.0, 3.0, 0.0, 1.0, -1.0, "ellipse")
+    model.beginUpdate()
+    try:
+        model.addSpotTo(contour, jc.Integer(0))
+        model.addSpotTo(ellipse, jc.Integer(0))
+    finally:
+        model.endUpdate()
+    imp = ij.convert().convert(ij.py.to_java(np.zeros((20, 20))), jc.ImagePlus)
+
+    labels = np.asarray(_lazy_label_image(model, imp))
+    assert labels.shape == (1, 20, 20)
+    # Assert the contour is drawn, rather than the radius
+    contour_label = labels[0, 10, 10]
+    assert contour_label > 0
+    assert np.all(labels[0, 7:14, 7:14] == contour_label)
+    assert labels[0, 6, 6] == 0
+    assert labels[0, 14, 14] == 0
+    # Assert spots outside of tracks are labeled uniquely
+    assert labels[0, 3, 3] > 0
+    assert {contour_label, labels[0, 3, 3]} == {1, 2}
+
+
+def test_track_overlay_predicate(ij, trackMate_example):
+    # Objects that are not ROITrees are rejected outright
+    assert not track_overlay_predicate("not a ROITree")
+    assert not track_overlay_predicate(jc.DefaultROITree())
+
+    model = trackMate_example.getModel()
+    selection_model = jc.SelectionModel(model)
+    imp = ij.convert().convert(ij.py.to_java(np.zeros((10, 10))), jc.ImagePlus)
+    jc.HyperStackDisplayer(model, selection_model, imp, jc.DisplaySettings()).render()
+    rois = ij.convert().convert(imp, jc.Dataset).getProperties()["rois"]
+
+    # Assert the verdict is cached per ROITree, and reused
+    assert track_overlay_predicate(rois)
+    key = jc.System.identityHashCode(rois)
+    assert _verdict_cache[key][2]
+    # Assert the ROITree is only weakly referenced
+    assert isinstance(_verdict_cache[key][0], jc.WeakReference)
+    assert _verdict_cache[key][0].get() == rois
+    assert track_overlay_predicate(rois)
+
+    # Remove the layer generated by this test
+    imp.changes = False
+    imp.close()
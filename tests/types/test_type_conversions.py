@@ -2,11 +2,12 @@
 A module testing napari_imagej.types.type_conversions
 """
 
-from typing import List
+from typing import List, Optional
 
 import pytest
 from jpype import JObject
 
+from napari_imagej.types import type_conversions
 from napari_imagej.types.enum_likes import OutOfBoundsFactory
 from napari_imagej.types.type_hints import type_hints
 from napari_imagej.utilities import _module_utils
@@ -115,3 +116,28 @@ def test_enum():
 def test_shape():
     p_type = _module_utils.type_hint_for(DummyModuleItem(jtype=jc.Shape))
     assert p_type == JObject
+
+
+def test_type_hint_cache():
+    item = DummyModuleItem(jtype=jc.EuclideanSpace, isInput=True, isOutput=False)
+    hint = _module_utils.type_hint_for(item)
+    key = (jc.EuclideanSpace, True, False, True)
+    assert type_conversions._TYPE_HINT_CACHE[key] == hint
+    # Assert the cached hint is reused
+    assert _module_utils.type_hint_for(DummyModuleItem(jtype=jc.EuclideanSpace)) is hint
+    # Assert optional items are hinted separately
+    item = DummyModuleItem(jtype=jc.EuclideanSpace, isRequired=False)
+    assert _module_utils.type_hint_for(item) == Optional[hint]
+
+
+def test_support_index():
+    type_conversions._SUPPORT_INDEX.clear()
+    item = DummyModuleItem(jtype=jc.DoubleArray, isInput=True, isOutput=False)
+    assert type_conversions.canConvertChecker(item) is not None
+    # Assert the ConvertService queries were indexed
+    assert type_conversions._SUPPORT_INDEX
+    # Assert indexed verdicts are used in place of the ConvertService
+    for k in type_conversions._SUPPORT_INDEX:
+        type_conversions._SUPPORT_INDEX[k] = False
+    assert type_conversions.canConvertChecker(item) is None
+    type_conversions._SUPPORT_INDEX.clear()
@@ -0,0 +1,44 @@
+"""
+A module testing napari_imagej.utilities.conversion_cache
+"""
+
+import numpy as np
+from napari.layers import Image
+
+from napari_imagej.utilities.conversion_cache import ConversionCache
+
+
+def test_conversion_cache(ij):
+    # NB room for the uint8 layer and one float64 layer, or two float64 layers
+    cache = ConversionCache(max_bytes=400)
+    layer = Image(np.zeros((10, 10), dtype=np.uint8), name="test_cache")
+
+    # Assert unchanged layers are converted once
+    dataset = cache.to_java(layer)
+    assert cache.to_java(layer) is dataset
+
+    # Assert data events invalidate the conversion
+    layer.data = np.ones((10, 10), dtype=np.uint8)
+    converted = cache.to_java(layer)
+    assert converted is not dataset
+    assert cache.to_java(layer) is converted
+
+    # Assert explicit invalidation
+    cache.invalidate(layer)
+    assert len(cache) == 0
+    previous, converted = converted, cache.to_java(layer)
+    assert converted is not previous
+
+    # Assert the least recently used conversion is evicted
+    others = [Image(np.zeros((5, 5)), name=f"test_cache_{i}") for i in range(2)]
+    others_converted = [cache.to_java(other) for other in others]
+    assert len(cache) == 2
+    assert cache.to_java(others[0]) is others_converted[0]
+    assert cache.to_java(layer) is not converted
+
+    # Assert layers too large for the cache are never cached
+    large = Image(np.zeros((30, 30), dtype=np.uint8), name="test_cache_large")
+    assert cache.to_java(large) is not cache.to_java(large)
+
+    cache.invalidate()
+    assert len(cache) == 0
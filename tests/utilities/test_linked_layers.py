@@ -0,0 +1,49 @@
+"""
+A module testing napari_imagej.utilities.linked_layers
+"""
+
+import dask.array as da
+import numpy as np
+import pytest
+from napari.layers import Image
+
+from napari_imagej.utilities.linked_layers import linked_layers
+
+
+def test_link_shares_data(ij):
+    layer = Image(np.zeros((10, 10), dtype=np.uint8), name="test_link")
+    dataset = linked_layers.link(layer)
+    try:
+        assert linked_layers.dataset(layer) == dataset
+        assert linked_layers.layer(dataset) is layer
+        # Assert linking again returns the same Dataset
+        assert linked_layers.link(layer) == dataset
+
+        # Assert edits in ImageJ are visible in napari, without a transfer
+        ra = dataset.randomAccess()
+        ra.setPosition(1, 0)
+        ra.setPosition(2, 1)
+        ra.get().setReal(5)
+        dataset.update()
+        assert layer.data[2, 1] == 5
+
+        # Assert edits in napari are visible in ImageJ, once announced
+        layer.data[3, 4] = 7
+        linked_layers.update(layer)
+        ra.setPosition(4, 0)
+        ra.setPosition(3, 1)
+        assert ra.get().getRealDouble() == 7
+
+        # Assert replacing the data of the layer unlinks it
+        layer.data = np.ones((10, 10), dtype=np.uint8)
+        assert linked_layers.dataset(layer) is None
+        assert linked_layers.layer(dataset) is None
+    finally:
+        linked_layers.unlink(layer)
+
+
+def test_link_requires_shareable_data(ij):
+    layer = Image(da.zeros((10, 10), dtype=np.uint8), name="test_link_lazy")
+    with pytest.raises(ValueError):
+        linked_layers.link(layer)
+    assert linked_layers.dataset(layer) is None
@@ -0,0 +1,71 @@
+"""
+A module testing napari_imagej.utilities.module_executor
+"""
+
+from concurrent.futures import Future, wait
+from threading import Event
+
+import pytest
+
+from napari_imagej import settings
+from napari_imagej.utilities import _module_utils
+from napari_imagej.utilities.module_executor import ModuleExecutor
+from tests.utils import jc
+
+script_increment: str = """
+#@ Integer n
+#@output Integer m
+m = n + 1
+"""
+
+
+@pytest.fixture
+def increment_info(ij, tmp_path):
+    p = tmp_path / "script.py"
+    p.write_text(script_increment)
+    return jc.ScriptInfo(ij.context(), str(p))
+
+
+def submit(ij, executor: ModuleExecutor, info, input_map) -> Future:
+    module = ij.module().createModule(info)
+    return executor.submit(
+        module,
+        _module_utils._preprocess_to_harvester(module),
+        _module_utils._get_postprocessors(),
+        input_map,
+    )
+
+
+def test_module_executor(asserter, ij, increment_info):
+    max_concurrency = 2
+    settings.max_concurrent_modules = max_concurrency
+    executor = ModuleExecutor()
+    release = Event()
+    converted = []
+
+    def inputs(n: int):
+        def input_map():
+            # Hold each dispatched module until released
+            converted.append(n)
+            release.wait(timeout=60)
+            j_inputs = jc.HashMap()
+            j_inputs.put("n", ij.py.to_java(n))
+            return j_inputs
+
+        return input_map
+
+    futures = [submit(ij, executor, increment_info, inputs(n)) for n in range(10)]
+    # Assert every module is accepted, without blocking...
+    assert executor.pending() == 10
+    assert not any(future.done() for future in futures)
+    # ...while only the running modules have their inputs converted
+    asserter(lambda: len(converted) == max_concurrency)
+    assert executor.pending() == 10
+
+    release.set()
+    done, _ = wait(futures, timeout=60)
+    assert len(done) == 10
+    for n, future in enumerate(futures):
+        assert future.result().getOutput("m") == n + 1
+    assert sorted(converted) == list(range(10))
+    assert executor.pending() == 0
@@ -2,6 +2,7 @@
 A module testing napari_imagej.utilities._module_utils
 """
 
+import pickle
 import sys
 from collections import OrderedDict
 from inspect import Parameter, _empty, signature
@@ -15,6 +16,7 @@ from napari.layers import Image, Layer
 from napari.utils._magicgui import get_layers
 from pandas import DataFrame
 
+from napari_imagej import settings
 from napari_imagej.types.type_hints import type_hints
 from napari_imagej.types.type_utils import _napari_layer_types
 from napari_imagej.utilities import _module_utils
@@ -716,3 +718,103 @@ def test_devise_layer_name():
     # Test "informative" names are left alone
     informative_name = "foo"
     assert informative_name == _module_utils._devise_layer_name(info, informative_name)
+
+
+def test_functionify_module_execution_signature_cache(imagej_widget, ij):
+    info = ij.module().getModuleById(
+        "command:net.imagej.ops.commands.filter.FrangiVesselness"
+    )
+    func1, kwargs1 = _module_utils.functionify_module_execution(
+        lambda o: imagej_widget.output_handler.emit(o), info.createModule(), info
+    )
+    assert any(
+        key[0] == str(info.getIdentifier()) for key in _module_utils._SIGNATURE_CACHE
+    )
+    # Assert the second function reuses the cached signature
+    func2, kwargs2 = _module_utils.functionify_module_execution(
+        lambda o: imagej_widget.output_handler.emit(o), info.createModule(), info
+    )
+    assert signature(func1) is signature(func2)
+    assert func1.__annotation__ == func2.__annotation__
+    assert func2._info == info
+    # Assert each function gets its own magicgui keyword arguments
+    assert kwargs1 == kwargs2
+    assert kwargs1 is not kwargs2
+
+
+def test_save_signatures(monkeypatch, tmp_path):
+    signature_file = tmp_path / "signatures.pickle"
+    signatures = {("command:foo", ()): b"bar"}
+    monkeypatch.setattr(_module_utils, "_SIGNATURE_FILE", str(signature_file))
+    monkeypatch.setattr(_module_utils, "_PICKLED_SIGNATURES", signatures)
+    # Assert nothing is written unless signatures were cached
+    monkeypatch.setattr(_module_utils, "_signatures_changed", False)
+    _module_utils._save_signatures()
+    assert not signature_file.exists()
+    # Assert cached signatures are written in one piece
+    monkeypatch.setattr(_module_utils, "_signatures_changed", True)
+    _module_utils._save_signatures()
+    with open(signature_file, "rb") as f:
+        assert pickle.load(f) == signatures
+    assert list(tmp_path.iterdir()) == [signature_file]
+
+
+def test_processor_pool(ij):
+    first = _module_utils._get_postprocessors()
+    second = _module_utils._get_postprocessors()
+    # Assert each call gets a new list...
+    assert first is not second
+    first.clear()
+    assert second.size() > 0
+    # ...of the same, shared processors
+    assert all(a == b for a, b in zip(second, _module_utils._get_postprocessors()))
+    # Assert problematic postprocessors are excluded
+    assert not any(
+        isinstance(p, (jc.DisplayPostprocessor, jc.ResultsPostprocessor))
+        for p in second
+    )
+    # Assert Cancelable processors are never shared between runs
+    preprocessors = _module_utils._preprocessors.instances()
+    assert preprocessors.size() > 0
+    assert not any(
+        a == b
+        for a, b in zip(preprocessors, _module_utils._preprocessors.instances())
+        if isinstance(a, jc.Cancelable)
+    )
+
+
+script_identity: str = """
+#@ Img data
+#@output Img out
+
+out = data
+"""
+
+
+def test_run_module_batch(ij, tmp_path):
+    p = tmp_path / "script.py"
+    p.write_text(script_identity)
+    info: "jc.ScriptInfo" = jc.ScriptInfo(ij.context(), str(p))
+    data = numpy.random.randint(0, 255, (5, 4, 3), dtype=numpy.uint8)
+
+    # Run over each plane of a layer
+    settings.max_concurrent_modules = 2
+    future = _module_utils.run_module_batch(
+        info, "data", Image(data, name="movie"), axis="Z"
+    )
+    layers, widgets = future.result(timeout=60)
+    assert len(layers) == 1
+    assert len(widgets) == 0
+    assert isinstance(layers[0], Image)
+    assert numpy.array_equal(layers[0].data, data)
+
+    # Run over each of a list of layers
+    layers, _ = _module_utils.run_module_batch(
+        info, "data", [Image(data[i]) for i in range(2)]
+    ).result(timeout=60)
+    assert len(layers) == 1
+    assert numpy.array_equal(layers[0].data, data[:2])
+
+    # Assert an axis is required for a layer
+    with pytest.raises(ValueError):
+        _module_utils.run_module_batch(info, "data", Image(data))
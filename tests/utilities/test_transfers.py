@@ -0,0 +1,139 @@
+"""
+A module testing napari_imagej.utilities.transfers
+"""
+
+from threading import Barrier, Event
+
+import numpy as np
+import pytest
+
+from napari_imagej.utilities.transfers import (
+    TransferQueue,
+    _run_transfer,
+    _TransferProgress,
+    nbytes_of,
+    transfer_all,
+    transfer_one,
+)
+
+
+def test_nbytes_of():
+    data = np.zeros((10, 10), dtype=np.uint16)
+    assert nbytes_of(data) == 200
+    # Multiscale data is transferred at its finest level
+    assert nbytes_of([data, data[::2, ::2]]) == 200
+    assert nbytes_of("not data") == 0
+
+
+def test_transfers_run_in_order(asserter, ij):
+    queue = TransferQueue()
+    results = []
+
+    def transfer(value):
+        def func():
+            yield 1
+            return value
+
+        return func
+
+    for i in range(3):
+        queue.submit(transfer(i), results.append, f"Transfer {i}", 1)
+    # Assert later transfers are queued while the first is in flight
+    assert queue.busy()
+
+    asserter(lambda: len(results) == 3)
+    assert results == [0, 1, 2]
+    asserter(lambda: not queue.busy())
+
+
+def test_transfer_progress_cancel():
+    canceled = []
+    pbar = _TransferProgress(total=10, desc="Transfer")
+    pbar.cancel_callback = lambda: canceled.append(True)
+    try:
+        # Assert the Cancel button cancels the transfer immediately
+        pbar.cancel()
+        assert canceled == [True]
+    finally:
+        pbar.close()
+
+
+def test_transfer_one():
+    release = Event()
+
+    def convert(item):
+        release.wait(timeout=10)
+        return item * 2
+
+    # Assert the transfer yields while converting, such that it can be canceled
+    transfer = transfer_one(convert, 1, 10)
+    assert next(transfer) == 0
+    transfer.close()
+
+    transfer = transfer_one(convert, 1, 10)
+    assert next(transfer) == 0
+    release.set()
+    moved = []
+    try:
+        while True:
+            moved.append(next(transfer))
+    except StopIteration as e:
+        result = e.value
+    assert moved[-1] == 10
+    assert result == 2
+
+
+def test_run_transfer():
+    closed = []
+
+    def transfer():
+        try:
+            yield 1
+            yield 2
+            return "done"
+        finally:
+            closed.append(True)
+
+    # Assert the transfer's yields and result are passed through
+    moves = _run_transfer(transfer)
+    assert next(moves) == 1
+    assert next(moves) == 2
+    with pytest.raises(StopIteration) as e:
+        next(moves)
+    assert e.value.value == "done"
+    # Assert canceling the transfer closes it (e.g. cancels its conversions)
+    moves = _run_transfer(transfer)
+    assert next(moves) == 1
+    moves.close()
+    assert closed == [True, True]
+
+
+def test_transfer_all():
+    # Assert conversions overlap - each waits until the other has started
+    barrier = Barrier(2, timeout=10)
+
+    def convert(item):
+        barrier.wait()
+        return item * 2
+
+    transfer = transfer_all(convert, [1, 2], [10, 20])
+    moved = []
+    try:
+        while True:
+            moved.append(next(transfer))
+    except StopIteration as e:
+        results = e.value
+
+    # NB the transfer may also yield zero bytes while converting
+    assert sorted(m for m in moved if m) == [10, 20]
+    # Assert results are in the order of the items
+    assert results == [2, 4]
+    # Assert nothing to convert is handled
+    assert list(transfer_all(convert, [], [])) == []
+
+    # Assert canceling does not wait for conversions in flight
+    release = Event()
+    transfer = transfer_all(lambda item: release.wait(timeout=10), [1, 2], [10, 20])
+    assert next(transfer) == 0
+    transfer.close()
+    release.set()
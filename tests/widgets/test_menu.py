@@ -25,11 +25,13 @@ from napari_imagej.resources import resource_path
 from napari_imagej.widgets import menu
 from napari_imagej.widgets.menu import (
     DetailExportDialog,
+    FromIJAllButton,
     FromIJButton,
     GUIButton,
     NapariImageJMenu,
     REPLButton,
     SettingsButton,
+    ToIJAllButton,
     ToIJButton,
     ToIJDetailedButton,
 )
@@ -177,15 +179,17 @@ def clean_gui_elements(asserter, ij, viewer: Viewer):
 def test_widget_layout(gui_widget: NapariImageJMenu):
     """Tests the number and expected order of imagej_widget children"""
     subwidgets = gui_widget.children()
-    assert len(subwidgets) == 7
+    assert len(subwidgets) == 9
     assert isinstance(subwidgets[0], QHBoxLayout)
 
     assert isinstance(subwidgets[1], FromIJButton)
-    assert isinstance(subwidgets[2], ToIJButton)
-    assert isinstance(subwidgets[3], ToIJDetailedButton)
-    assert isinstance(subwidgets[4], GUIButton)
-    assert isinstance(subwidgets[5], REPLButton)
-    assert isinstance(subwidgets[6], SettingsButton)
+    assert isinstance(subwidgets[2], FromIJAllButton)
+    assert isinstance(subwidgets[3], ToIJButton)
+    assert isinstance(subwidgets[4], ToIJAllButton)
+    assert isinstance(subwidgets[5], ToIJDetailedButton)
+    assert isinstance(subwidgets[6], GUIButton)
+    assert isinstance(subwidgets[7], REPLButton)
+    assert isinstance(subwidgets[8], SettingsButton)
 
 
 def test_GUIButton_layout_headful(qtbot, asserter, ij, gui_widget: NapariImageJMenu):
@@ -318,6 +322,70 @@ def test_active_data_receive(asserter, qtbot, ij, gui_widget: NapariImageJMenu):
     assert (10, 10, 10) == layer.data.shape
 
 
+def test_all_data_send(asserter, qtbot, ij, gui_widget: NapariImageJMenu):
+    if settings.headless():
+        pytest.skip("Only applies when not running headlessly")
+    if settings.include_imagej_legacy:
+        pytest.skip(
+            """HACK: Disabled with ImageJ legacy.
+    See https://github.com/imagej/napari-imagej/issues/181
+            """
+        )
+
+    button: ToIJAllButton = gui_widget.to_ij_all
+    assert not button.isEnabled()
+
+    # Show the button
+    qtbot.mouseClick(gui_widget.gui_button, Qt.LeftButton, delay=1)
+    # Add some data to the viewer
+    for i in range(3):
+        image = Image(data=numpy.full((100, 100), i), name=f"test_to_{i}")
+        current_viewer().add_layer(image)
+    asserter(lambda: button.isEnabled())
+
+    # Press the button
+    qtbot.mouseClick(button, Qt.LeftButton, delay=1)
+
+    # Assert that all the data is now in Fiji
+    def check_displays():
+        names = {str(d.getName()) for d in ij.display().getDisplays()}
+        return names == {"test_to_0", "test_to_1", "test_to_2"}
+
+    asserter(check_displays)
+
+
+def test_all_data_receive(asserter, qtbot, ij, gui_widget: NapariImageJMenu):
+    if settings.headless():
+        pytest.skip("Only applies when not running headlessly")
+    if settings.include_imagej_legacy:
+        pytest.skip(
+            """HACK: Disabled with ImageJ legacy.
+    See https://github.com/imagej/napari-imagej/issues/181
+            """
+        )
+
+    button: FromIJAllButton = gui_widget.from_ij_all
+
+    # Show the button
+    gui_widget.gui_button.clicked.emit()
+
+    # Add some data to ImageJ
+    for i in range(3):
+        ij.ui().show(f"test_from_{i}", jc.ArrayImgs.bytes(10, 10, i + 1))
+    asserter(lambda: ij.display().getDisplays().size() == 3)
+
+    # Press the button
+    assert 0 == len(button.viewer.layers)
+    qtbot.mouseClick(button, Qt.LeftButton, delay=1)
+
+    # Assert that all the data is now in napari
+    asserter(lambda: 3 == len(button.viewer.layers))
+    for layer in button.viewer.layers:
+        assert isinstance(layer, Image)
+    names = {layer.name for layer in button.viewer.layers}
+    assert names == {"test_from_0", "test_from_1", "test_from_2"}
+
+
 def test_advanced_data_transfer(
     popup_handler, asserter, ij, gui_widget: NapariImageJMenu
 ):
@@ -488,6 +556,64 @@ def test_modification_in_imagej(asserter, qtbot, ij, gui_widget: NapariImageJMen
     assert numpy.all(modified_layer[1:, :, :] == 1)
 
 
+def _spy_sync_image(ij, monkeypatch) -> list:
+    synced = []
+    sync_image = ij.py.sync_image
+
+    def spy(imp):
+        synced.append(imp)
+        sync_image(imp)
+
+    monkeypatch.setattr(ij.py, "sync_image", spy)
+    return synced
+
+
+def test_sync_image_skips_unchanged(ij, monkeypatch):
+    if not settings.include_imagej_legacy:
+        pytest.skip("Tests legacy behavior")
+    if settings.headless():
+        pytest.skip("Only applies when not running headlessly")
+
+    imp = ij.IJ.createImage("test_sync", "8-bit black", 10, 10, 1)
+    imp.show()
+    synced = _spy_sync_image(ij, monkeypatch)
+    try:
+        # Assert an unchanged ImagePlus is only synced once
+        menu._sync_image(imp)
+        menu._sync_image(imp)
+        assert len(synced) == 1
+        # Assert updated ImagePlus edits are synced
+        imp.getProcessor().invert()
+        imp.updateAndDraw()
+        menu._sync_image(imp)
+        assert len(synced) == 2
+        # Assert replaced pixels are synced
+        imp.getProcessor().setPixels(imp.getProcessor().getPixelsCopy())
+        menu._sync_image(imp)
+        assert len(synced) == 3
+        # Assert edits flagged as changes are synced
+        imp.changes = True
+        menu._sync_image(imp)
+        assert len(synced) == 4
+    finally:
+        imp.changes = False
+        imp.close()
+
+
+def test_sync_image_hidden(ij, monkeypatch):
+    if not settings.include_imagej_legacy:
+        pytest.skip("Tests legacy behavior")
+
+    # NB images that are not displayed announce no updates
+    imp = ij.IJ.createImage("test_sync_hidden", "8-bit black", 10, 10, 1)
+    synced = _spy_sync_image(ij, monkeypatch)
+    # Assert hidden images are always synced, even when edited silently
+    menu._sync_image(imp)
+    imp.getProcessor().invert()
+    menu._sync_image(imp)
+    assert len(synced) == 2
+
+
 def test_image_plus_to_napari(asserter, qtbot, ij, gui_widget: NapariImageJMenu):
     if settings.headless():
         pytest.skip("Only applies when not running headlessly")